@@ -0,0 +1,1322 @@
+#!/usr/bin/env python3
+"""
+DMCT Benchmarks - How fast does trust travel?
+
+  python3 benchmark.py                    # before/after comparisons
+  python3 benchmark.py suite              # core suite, checked against the baseline
+  python3 benchmark.py suite --save-baseline
+  python3 benchmark.py suite --save-reference
+  python3 benchmark.py suite --tolerance=0.4
+
+The suite writes benchmark_results.json and exits 1 when a case is slower
+or uses more memory than benchmark_baseline.json by more than the
+tolerance (at least SUB_MS_TOLERANCE for timings under a millisecond),
+and 2 when there is no baseline to check against. The baseline committed
+here is a reference, saved with --save-reference: it holds runs to its
+peak memory on the same Python, but not to timings taken on another host.
+To gate timings too, save a baseline on the machine the suite runs on.
+"""
+
+import contextlib
+import gc
+import io
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+import dmct
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+RESULTS_FILE = 'benchmark_results.json'
+REGRESSION_TOLERANCE = 0.25
+SUB_MS_TOLERANCE = 0.5  # Timing tolerance for cases whose baseline p50 is under a millisecond
+MISSING_BASELINE = 2  # Suite exit code when nothing can be checked, apart from 1 for a regression
+
+def _timeit(fn, repeat=5):
+    """Best wall time of several runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def _random_waves(count, rng):
+    now = time.time()
+    waves = []
+    for _ in range(count):
+        origin = dmct.SpacetimePoint(
+            rng.uniform(-10, 10),
+            rng.uniform(-10, 10),
+            rng.uniform(-10, 10),
+            now - rng.uniform(0, 3600)
+        )
+        waves.append(dmct.TrustWave(
+            origin,
+            amplitude=rng.uniform(0.5, 2.0),
+            frequency=rng.random(),
+            phase=rng.random() * 2 * math.pi
+        ))
+    return waves
+
+def bench_field(wave_counts=(100, 1000, 10000, 50000), seed=0):
+    """WaveStore.field_at against the per-object TrustWave.field_at loop"""
+    rng = random.Random(seed)
+    results = []
+    
+    for count in wave_counts:
+        waves = _random_waves(count, rng)
+        store = dmct.WaveStore(waves)
+        point = dmct.SpacetimePoint(0, 0, 0, time.time())
+        
+        loop = _timeit(lambda: sum(wave.field_at(point) for wave in waves))
+        batched = _timeit(lambda: store.field_at(point))
+        
+        results.append({
+            'waves': count,
+            'loop_s': loop,
+            'batched_s': batched,
+            'speedup': loop / batched
+        })
+    
+    return results
+
+class _ThreadPerDelivery:
+    """The original fan-out: one fresh thread per neighbor per emit"""
+    
+    def __init__(self):
+        self.threads = []
+        self.submitted = 0
+    
+    def submit(self, fn, *args, delay=0.0):
+        self.submitted += 1
+        thread = threading.Thread(target=fn, args=args)
+        thread.start()
+        self.threads.append(thread)
+    
+    def join(self):
+        while self.threads:
+            self.threads.pop().join()
+
+def bench_propagation(node_counts=(20, 50, 100), emits=20, seed=0):
+    """Deliveries per second for a dense network under each executor"""
+    executors = {
+        'thread-per-delivery': _ThreadPerDelivery,
+        'pool': dmct.PropagationExecutor,
+        'inline': lambda: dmct.PropagationExecutor(inline=True)
+    }
+    results = []
+    
+    for count in node_counts:
+        rng = random.Random(seed)
+        positions = [(rng.uniform(-10, 10), rng.uniform(-10, 10), rng.uniform(-10, 10))
+                     for _ in range(count)]
+        
+        for name, factory in executors.items():
+            executor = factory()
+            network = dmct.Network(executor)
+            for x, y, z in positions:
+                network.add_node(dmct.Node(dmct.SpacetimePoint(x, y, z), identity=rng.random()))
+            executor.join()
+            
+            before = executor.submitted
+            start = time.perf_counter()
+            for node in network.nodes[:emits]:
+                node.emit(amplitude=1.0)
+            executor.join()
+            elapsed = time.perf_counter() - start
+            deliveries = executor.submitted - before
+            
+            results.append({
+                'nodes': count,
+                'executor': name,
+                'deliveries': deliveries,
+                'seconds': elapsed,
+                'deliveries_per_s': deliveries / elapsed
+            })
+    
+    return results
+
+class _ScanNetwork(dmct.Network):
+    """The original add_node: compare against every node already present"""
+    
+    def add_node(self, node):
+        if self.executor:
+            node.executor = self.executor
+        self.nodes.append(node)
+        for other in self.nodes:
+            if other != node and node.position.distance(other.position) < dmct.NEIGHBOR_RADIUS * 2:
+                node.connect(other)
+        node.emit(amplitude=2.0, data={'type': 'join', 'epoch': self.epoch})
+
+def bench_network_build(node_counts=(1000, 5000, 20000, 100000), scan_limit=5000,
+                        neighbors=8, seed=0):
+    """Network construction at constant density, linear scan vs SpatialGrid"""
+    results = []
+    
+    for count in node_counts:
+        # Size the volume so each node has about `neighbors` neighbors
+        reach = dmct.NEIGHBOR_RADIUS * 2
+        side = (count * 4 / 3 * math.pi * reach**3 / neighbors) ** (1 / 3)
+        rng = random.Random(seed)
+        nodes = [dmct.Node(dmct.SpacetimePoint(rng.uniform(0, side), rng.uniform(0, side),
+                                               rng.uniform(0, side)), identity=rng.random())
+                 for _ in range(count)]
+        
+        for name, cls in (('scan', _ScanNetwork), ('grid', dmct.Network)):
+            if name == 'scan' and count > scan_limit:
+                continue
+            for node in nodes:
+                node.neighbors, node.neighbor_set, node.waves = [], set(), dmct.WaveStore()
+            network = cls(dmct.PropagationExecutor(inline=True))
+            start = time.perf_counter()
+            for node in nodes:
+                network.add_node(node)
+            elapsed = time.perf_counter() - start
+            
+            results.append({
+                'nodes': count,
+                'index': name,
+                'seconds': elapsed,
+                'avg_neighbors': sum(len(n.neighbors) for n in nodes) / count
+            })
+    
+    return results
+
+def bench_expiry(days=60, waves_per_hour=50, seed=0):
+    """Memory and field-evaluation time reclaimed by the timing wheel"""
+    rng = random.Random(seed)
+    now = time.time()
+    hours = days * 24
+    waves = [
+        dmct.TrustWave(dmct.SpacetimePoint(rng.uniform(-10, 10), rng.uniform(-10, 10),
+                                           rng.uniform(-10, 10), now - (hours - h) * 3600),
+                       amplitude=rng.uniform(0.5, 2.0), frequency=rng.random(),
+                       phase=rng.random() * 2 * math.pi)
+        for h in range(hours) for _ in range(waves_per_hour)
+    ]
+    point = dmct.SpacetimePoint(0, 0, 0, now)
+    
+    keep_all = dmct.WaveStore(waves, epsilon=0)
+    wheel = dmct.WaveStore(waves)
+    full = _timeit(lambda: keep_all.field_at(point))
+    pruned = _timeit(lambda: wheel.field_at(point))
+    stats = wheel.stats()
+    
+    return {
+        'waves': len(waves),
+        'live': stats['live'],
+        'expired': stats['expired'],
+        'reclaimed_bytes': stats['reclaimed_bytes'],
+        'expire_seconds': stats['expire_seconds'],
+        'field_all_s': full,
+        'field_wheel_s': pruned,
+        'field_error': abs(keep_all.field_at(point) - wheel.field_at(point))
+    }
+
+def bench_phasor(wave_counts=(1000, 10000, 100000), sources=20, tolerance=1e-6, seed=0):
+    """Phasor aggregation against the exact per-wave sum: speed and accuracy"""
+    rng = random.Random(seed)
+    now = time.time()
+    emitters = [(rng.uniform(-10, 10), rng.uniform(-10, 10), rng.uniform(-10, 10), rng.random())
+                for _ in range(sources)]
+    results = []
+    
+    for count in wave_counts:
+        store = dmct.WaveStore()
+        for _ in range(count):
+            x, y, z, frequency = rng.choice(emitters)
+            store.append(dmct.TrustWave(dmct.SpacetimePoint(x, y, z, now - rng.uniform(0, 3 * 86400)),
+                                        amplitude=rng.uniform(0.5, 2.0), frequency=frequency,
+                                        phase=rng.random() * 2 * math.pi))
+        
+        # Walk the receiver forward in time, adding a wave per step
+        worst = 0.0
+        for step in range(50):
+            t = now + step * 0.5
+            x, y, z, frequency = rng.choice(emitters)
+            store.append(dmct.TrustWave(dmct.SpacetimePoint(x, y, z, t - rng.uniform(0, 20)),
+                                        frequency=frequency, phase=rng.random() * 2 * math.pi))
+            point = dmct.SpacetimePoint(0, 0, 0, t)
+            scale = sum(abs(w.amplitude) for w in store)
+            worst = max(worst, abs(store.field_at(point) - store.phasor_field_at(point)) / scale)
+        if worst > tolerance:
+            raise AssertionError(f"phasor field off by {worst:.2e} (relative) at {count} waves")
+        
+        exact = _timeit(lambda: store.field_at(point))
+        aggregated = _timeit(lambda: store.phasor_field_at(point))
+        results.append({
+            'waves': count,
+            'sources': sources,
+            'exact_s': exact,
+            'phasor_s': aggregated,
+            'speedup': exact / aggregated,
+            'max_relative_error': worst
+        })
+    
+    return results
+
+def _sparse_network(count, executor, neighbors=8, seed=0):
+    """count nodes spread at constant density, about `neighbors` each"""
+    reach = dmct.NEIGHBOR_RADIUS * 2
+    side = (count * 4 / 3 * math.pi * reach**3 / neighbors) ** (1 / 3)
+    rng = random.Random(seed)
+    network = dmct.Network(executor)
+    for _ in range(count):
+        network.add_node(dmct.Node(dmct.SpacetimePoint(rng.uniform(0, side), rng.uniform(0, side),
+                                                       rng.uniform(0, side)), identity=rng.random()))
+    return network
+
+def bench_cascade(node_counts=(1000, 10000), seed=0):
+    """
+    Work done by one emission when every node is primed to cascade.
+    Each node first absorbs a strong, long-arrived wave of its own, so any
+    further wave it receives pushes it over the interference threshold.
+    """
+    results = []
+    
+    for count in node_counts:
+        executor = dmct.PropagationExecutor(inline=True)
+        network = _sparse_network(count, executor, seed=seed)
+        for node in network.nodes:
+            p = node.position
+            node.waves.append(dmct.TrustWave(dmct.SpacetimePoint(p.x, p.y, p.z, time.time() - 60),
+                                             amplitude=100.0, frequency=0.0))
+        
+        def totals():
+            return {name: sum(node.counters[name] for node in network.nodes)
+                    for name in network.nodes[0].counters}
+        
+        before, submitted = totals(), executor.submitted
+        start = time.perf_counter()
+        network.nodes[0].emit(amplitude=1.0)
+        elapsed = time.perf_counter() - start
+        after = totals()
+        results.append({
+            'nodes': count,
+            'deliveries': executor.submitted - submitted,
+            'seconds': elapsed,
+            **{name: after[name] - before[name] for name in after}
+        })
+    
+    return results
+
+def bench_simulation(duration=60, seed=42):
+    """Simulated seconds per wall second, and whether a seeded run replays exactly"""
+    runs = []
+    for _ in range(2):
+        with dmct.Simulation(seed=seed) as engine:
+            network = dmct.genesis()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                dmct.simulate(network, duration=duration, engine=engine)
+            elapsed = time.perf_counter() - start
+        fingerprint = [(node.identity, len(node.waves), node.waves[-1].id) for node in network.nodes]
+        runs.append((elapsed, engine.stats(), fingerprint))
+    
+    (elapsed, stats, first), (_, _, second) = runs
+    return {
+        'simulated_s': duration,
+        'wall_s': elapsed,
+        'speedup': duration / elapsed,
+        'events': sum(stats['processed'].values()),
+        'nodes': len(first),
+        'replayed': first == second
+    }
+
+def bench_snapshot(node_counts=(1000, 10000), emits=50, seed=0):
+    """Per-tick cost of visualize() against snapshot(since) and totals()"""
+    results = []
+    
+    for count in node_counts:
+        executor = dmct.PropagationExecutor(inline=True)
+        network = _sparse_network(count, executor, seed=seed)
+        rng = random.Random(seed)
+        version = network.snapshot()['version']
+        
+        # One tick's worth of activity, then each way of reading it
+        for node in rng.sample(network.nodes, emits):
+            node.emit(amplitude=1.0)
+        
+        results.append({
+            'nodes': count,
+            'visualize_s': _timeit(network.visualize, repeat=3),
+            'snapshot_s': _timeit(lambda: network.snapshot(version), repeat=3),
+            'totals_s': _timeit(network.totals, repeat=3),
+            'changed_nodes': len(network.snapshot(version)['nodes'])
+        })
+    
+    return results
+
+def bench_sharded(worker_counts=(1, 2, 4, 8), count=5000, neighbors=8, seed=0):
+    """ShardedNetwork scaling: parallel construction, then every node pulses"""
+    import sharded
+    
+    reach = dmct.NEIGHBOR_RADIUS * 2
+    side = (count * 4 / 3 * math.pi * reach**3 / neighbors) ** (1 / 3)
+    results = []
+    
+    for workers in worker_counts:
+        rng = random.Random(seed)
+        with dmct.Simulation(seed=seed) as engine, sharded.ShardedNetwork(workers, seed=seed) as network:
+            nodes = [dmct.Node(dmct.SpacetimePoint(rng.uniform(0, side), rng.uniform(0, side),
+                                                   rng.uniform(0, side)), identity=rng.random())
+                     for _ in range(count)]
+            start = time.perf_counter()
+            network.add_nodes(nodes)
+            built = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            network.pulse()
+            for _ in range(3):
+                engine.clock.t += reach / dmct.TRUST_SPEED
+                network.advance()
+            pulsed = time.perf_counter() - start
+            
+            results.append({
+                'workers': workers,
+                'nodes': count,
+                'build_s': built,
+                'pulse_s': pulsed,
+                'halo_messages': network.halo_count
+            })
+    
+    return results
+
+def _consensus_events(count, rng, rate=1000.0, extent=100.0, distinct=100):
+    """Synthetic consensus events, `rate` per second spread over a cube, `distinct` payloads (None: all unique)"""
+    start = time.time()
+    for i in range(count):
+        yield {
+            'id': f"{i:016x}",
+            'position': (rng.uniform(0, extent), rng.uniform(0, extent), rng.uniform(0, extent)),
+            'time': start + i / rate,
+            'data': {'tx': i % distinct if distinct else i},
+            'amplitude': 1.0,
+            'confirmations': 0
+        }
+
+class _DictConsensus:
+    """SpacetimeConsensus before the causal index and the event log: a list of dicts"""
+    
+    def __init__(self):
+        import consensus as spacetime
+        
+        self.helper = spacetime.SpacetimeConsensus()
+        self.c = self.helper.c
+        self.events = []
+        self.light_cones = {}
+        self.standing_waves = {}
+    
+    def _append(self, event):
+        self.events.append(event)
+        return event
+    
+    def _update_light_cones(self, new_event):
+        distance = self.helper._distance
+        for event in self.events[:-1]:
+            if distance(event['position'], new_event['position']) <= self.c * abs(new_event['time'] - event['time']):
+                self.light_cones.setdefault(event['id'], []).append(new_event['id'])
+    
+    def _check_interference(self, new_event):
+        for event in self.events:
+            if event['id'] == new_event['id']:
+                continue
+            phase_diff = self.helper._calculate_phase_difference(event, new_event)
+            if abs(math.cos(phase_diff)) > 0.8:
+                event['confirmations'] += new_event['amplitude']
+                new_event['confirmations'] += event['amplitude']
+                key = self.helper._get_data_key(event['data'])
+                if key not in self.standing_waves:
+                    self.standing_waves[key] = {'amplitude': 0, 'events': [], 'center': [0, 0, 0]}
+                self.standing_waves[key]['amplitude'] += abs(math.cos(phase_diff))
+                self.standing_waves[key]['events'].append(event['id'])
+    
+    def get_timeline(self, node_position):
+        current_time = time.time()
+        visible_events = []
+        for event in self.events:
+            distance = self.helper._distance(node_position, event['position'])
+            time_elapsed = current_time - event['time']
+            if distance <= self.c * time_elapsed:
+                visible_events.append({
+                    'id': event['id'],
+                    'data': event['data'],
+                    'confidence': event['confirmations'] / 10.0,
+                    'age': time_elapsed,
+                    'distance': distance
+                })
+        visible_events.sort(key=lambda e: e['age'] - e['distance'] / self.c)
+        return visible_events
+    
+    def merge_timelines(self, other):
+        for event in other.events:
+            if not any(e['id'] == event['id'] for e in self.events):
+                self.events.append(event)
+        self.light_cones = {}
+        self.standing_waves = {}
+        for event in self.events:
+            self._update_light_cones(event)
+            self._check_interference(event)
+        return len(self.events)
+
+def _ledger(kind):
+    import consensus as spacetime
+    
+    return _DictConsensus() if kind == 'dicts' else spacetime.SpacetimeConsensus()
+
+def _udp_flood(port, packets, sources, seed, rate=None):
+    """Sender process: `packets` waves from `sources` fixed peers, `rate` a second or as fast as possible"""
+    import socket
+    import network_node
+    
+    rng = random.Random(seed)
+    peers = [(rng.uniform(-10, 10), rng.uniform(-10, 10), rng.uniform(-10, 10)) for _ in range(sources)]
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    start = time.time()
+    paced = time.perf_counter()
+    for n in range(packets):
+        if rate and n % 100 == 0:
+            paced += 100 / rate
+            time.sleep(max(0.0, paced - time.perf_counter()))
+        x, y, z = peers[n % sources]
+        wave = dmct.TrustWave(dmct.SpacetimePoint(x, y, z, start + n * 1e-6), frequency=1.0 + n % sources,
+                              data={'sent': time.perf_counter()})
+        sock.sendto(network_node._wave_packet(wave), ('127.0.0.1', port))
+    sock.close()
+
+def bench_udp(rates=(5000, None), packets=20000, sources=16, seed=0):
+    """Waves taken in over loopback UDP: recvfrom thread vs asyncio DatagramProtocol with a bounded pool"""
+    import asyncio
+    import multiprocessing
+    import socket
+    import network_node
+    
+    class Timed:
+        # perf_counter is CLOCK_MONOTONIC, shared with the sender process
+        def _receive_wave(self, wave):
+            super()._receive_wave(wave)
+            self.latencies.append(time.perf_counter() - wave.data['sent'])
+    
+    class ThreadedNode(Timed, network_node.NetworkNode):
+        pass
+    
+    class AsyncNode(Timed, network_node.AsyncNetworkNode):
+        pass
+    
+    def settle(node, start):
+        """Seconds from the first send to the last wave processed, once the node goes quiet"""
+        count, last = -1, time.perf_counter()
+        while len(node.latencies) != count or time.perf_counter() - last < 0.5:
+            if len(node.latencies) != count:
+                count, last = len(node.latencies), time.perf_counter()
+            time.sleep(0.05)
+        return last - start
+    
+    def flood(port, rate):
+        sender = multiprocessing.Process(target=_udp_flood, args=(port, packets, sources, seed, rate))
+        sender.start()
+        return sender
+    
+    def summary(kind, rate, node, elapsed):
+        latencies = sorted(node.latencies)
+        return {
+            'node': kind,
+            'rate': rate,
+            'sent': packets,
+            'processed': len(latencies),
+            'per_s': len(latencies) / elapsed,
+            'p50_ms': latencies[len(latencies) // 2] * 1000 if latencies else math.nan,
+            'p99_ms': latencies[int(len(latencies) * 0.99)] * 1000 if latencies else math.nan
+        }
+    
+    def threaded(rate):
+        probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+        probe.close()
+        
+        node = ThreadedNode(port=port)
+        node.aggregate = True
+        node.latencies = []
+        server = threading.Thread(target=node._serve, daemon=True)
+        server.start()
+        time.sleep(0.2)
+        start = time.perf_counter()
+        flood(port, rate).join()
+        result = summary('thread', rate, node, settle(node, start))
+        node.running = False
+        socket.socket(socket.AF_INET, socket.SOCK_DGRAM).sendto(b'', ('127.0.0.1', port))
+        server.join(1.0)
+        node.server.close()
+        return result
+    
+    async def asynchronous(rate):
+        node = AsyncNode(port=0, host='127.0.0.1', aggregate=True)
+        node.latencies = []
+        await node.start()
+        start = time.perf_counter()
+        sender = flood(node.port, rate)
+        while sender.is_alive():
+            await asyncio.sleep(0.01)
+        elapsed = await asyncio.get_running_loop().run_in_executor(None, settle, node, start)
+        node.close()
+        return summary('asyncio', rate, node, elapsed)
+    
+    results = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for rate in rates:
+            gc.collect()
+            results.append(threaded(rate))
+            gc.collect()  # Nodes left by the last run would otherwise be swept partway through this one
+            results.append(asyncio.run(asynchronous(rate)))
+    
+    return results
+
+def bench_light_cones(event_counts=(1000, 10000, 100000, 1000000), scan_limit=10000, queries=3, seed=0):
+    """Light-cone upkeep per event as history grows: full scan vs CausalIndex"""
+    results = []
+    for kind in ('dicts', 'log'):
+        ledger = _ledger(kind)
+        stream = _consensus_events(max(event_counts), random.Random(seed))
+        filed = 0
+        
+        for count in event_counts:
+            if kind == 'dicts' and count > scan_limit:
+                break
+            # Time only the events that take the history up to `count`
+            before = filed
+            start = time.perf_counter()
+            for event in stream:
+                ledger._update_light_cones(ledger._append(event))
+                filed += 1
+                if filed == count:
+                    break
+            elapsed = time.perf_counter() - start
+            results.append({
+                'index': 'scan' if kind == 'dicts' else 'grid',
+                'events': count,
+                'us_per_event': elapsed / (filed - before) * 1e6
+            })
+        
+        if kind == 'log':
+            rng = random.Random(seed)
+            sample = [ledger.log.id(row) for row in rng.sample(range(len(ledger.log)), queries)]
+            start = time.perf_counter()
+            edges = sum(len(ledger.light_cones.get(event_id, ())) for event_id in sample)
+            results[-1]['query_ms'] = (time.perf_counter() - start) / queries * 1000
+            results[-1]['cone_size'] = edges / queries
+    
+    return results
+
+def bench_causality(count=3000, queries=1000, rate=10.0, seed=0):
+    """A long-running node's causality: explicit edge lists vs the CausalIndex behind is_causal/future_of"""
+    # At `rate` events a second the cones soon cover the whole field, the
+    # case where an edge list approaches N^2 / 2 entries
+    events = list(_consensus_events(count, random.Random(seed), rate=rate))
+    result = {'events': count}
+    edges = _ledger('dicts')
+    for event in events:
+        edges._update_light_cones(edges._append(dict(event)))
+    cones = edges.light_cones
+    result['edges'] = sum(len(later) for later in cones.values())
+    result['dicts_mib'] = (sys.getsizeof(cones) + sum(sys.getsizeof(later) for later in cones.values())) / 2**20
+    del edges, cones
+    
+    ledger = _ledger('log')
+    for event in events:
+        ledger._append(dict(event))
+    tracemalloc.start()
+    ledger._update_light_cones(len(ledger.log) - 1)
+    result['log_mib'] = tracemalloc.get_traced_memory()[0] / 2**20
+    tracemalloc.stop()
+    
+    rng = random.Random(seed)
+    pairs = [(rng.choice(events)['id'], rng.choice(events)['id']) for _ in range(queries)]
+    result['is_causal_us'] = _timeit(lambda: [ledger.is_causal(a, b) for a, b in pairs], repeat=1) / queries * 1e6
+    sample = [event['id'] for event in rng.sample(events, 5)]
+    result['future_of_ms'] = _timeit(lambda: [ledger.future_of(event_id) for event_id in sample], repeat=1) / 5 * 1000
+    return result
+
+def bench_interference(event_counts=(1000, 10000, 100000), probes=5, seed=0):
+    """One interference check against a growing history: per-event loop vs EventLog columns"""
+    results = []
+    for count in event_counts:
+        events = list(_consensus_events(count + probes, random.Random(seed)))
+        timings = {}
+        for kind in ('dicts', 'log'):
+            ledger = _ledger(kind)
+            for event in events[:count]:
+                ledger._append(dict(event))
+            start = time.perf_counter()
+            for event in events[count:]:
+                ledger._check_interference(ledger._append(dict(event)))
+            timings[kind] = (time.perf_counter() - start) / probes
+            del ledger
+        
+        results.append({
+            'events': count,
+            'loop_ms': timings['dicts'] * 1000,
+            'batched_ms': timings['log'] * 1000,
+            'speedup': timings['dicts'] / timings['log']
+        })
+    
+    return results
+
+def bench_event_memory(count=100000, payload_mixes=(100, None), seed=0):
+    """Bytes per logged event, payload included: one dict each vs EventLog columns
+    
+    Interning only pays off when payloads repeat, so each mix is measured on its own:
+    `distinct` payloads shared between the events, None for a payload per event.
+    """
+    results = []
+    for distinct in payload_mixes:
+        result = {'events': count, 'distinct': distinct or count}
+        for kind in ('dicts', 'log'):
+            tracemalloc.start()
+            ledger = _ledger(kind)
+            base = tracemalloc.get_traced_memory()[0]
+            for event in _consensus_events(count, random.Random(seed), distinct=distinct):
+                ledger._append(event)
+            result[f'{kind}_bytes'] = (tracemalloc.get_traced_memory()[0] - base) / count
+            tracemalloc.stop()
+            del ledger
+        
+        result['ratio'] = result['dicts_bytes'] / result['log_bytes']
+        results.append(result)
+    
+    return results
+
+def _replica(kind, events):
+    """A consensus replica holding `events`, built without the interference pass"""
+    ledger = _ledger(kind)
+    for event in events:
+        ledger._update_light_cones(ledger._append(dict(event)))
+    return ledger
+
+def bench_merge(event_counts=(1000, 2000, 100000, 1000000), divergent=10, rebuild_limit=2000, seed=0):
+    """Healing a partition: two replicas share history and each saw `divergent` events alone"""
+    results = []
+    for count in event_counts:
+        events = list(_consensus_events(count + 2 * divergent, random.Random(seed)))
+        shared, ours, theirs = events[:count], events[count:count + divergent], events[count + divergent:]
+        
+        for kind in ('dicts', 'log'):
+            if kind == 'dicts' and count > rebuild_limit:
+                continue
+            ledger = _replica(kind, shared + ours)
+            other = _replica(kind, shared + theirs)
+            start = time.perf_counter()
+            merged = ledger.merge_timelines(other)
+            results.append({
+                'events': count,
+                'merge': 'rebuild' if kind == 'dicts' else 'incremental',
+                'seconds': time.perf_counter() - start,
+                'merged': merged
+            })
+            del ledger, other
+    
+    return results
+
+def bench_merge_replicas(replica_counts=(8, 32), shared=2000, divergent=20, workers=4, seed=0):
+    """Healing a partition of many nodes: merge_timelines one by one vs one merge_replicas"""
+    results = []
+    for count in replica_counts:
+        events = list(_consensus_events(shared + count * divergent, random.Random(seed)))
+        history = events[:shared]
+        alone = [events[shared + n * divergent:shared + (n + 1) * divergent] for n in range(count)]
+        
+        result = {'replicas': count, 'shared': shared, 'unique': shared + count * divergent}
+        for mode in ('chained', 'k-way', 'pool'):
+            ledger = _replica('log', history + alone[0])
+            others = [_replica('log', history + events) for events in alone[1:]]
+            start = time.perf_counter()
+            if mode == 'chained':
+                for other in others:
+                    merged = ledger.merge_timelines(other)
+            else:
+                merged = ledger.merge_replicas(others, workers=1 if mode == 'k-way' else workers)
+            result[f'{mode}_s'] = time.perf_counter() - start
+            result['merged'] = merged
+            del ledger, others
+        results.append(result)
+    
+    return results
+
+def bench_timeline(event_counts=(10000, 100000), polls=20, limit=10, rate=1000.0, seed=0):
+    """One dashboard poll: full scan and sort vs iter_timeline's top-k walk"""
+    results = []
+    for count in event_counts:
+        # History that ends now, so most of it is visible
+        rng = random.Random(seed)
+        shift = count / rate
+        events = [dict(event, time=event['time'] - shift) for event in _consensus_events(count, rng, rate)]
+        positions = [(rng.uniform(0, 100), rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(polls)]
+        
+        timings = {}
+        for kind in ('dicts', 'log'):
+            ledger = _ledger(kind)
+            for event in events:
+                ledger._append(event)
+            ledger.get_timeline(positions[0])
+            timings[kind] = _timeit(lambda: [ledger.get_timeline(p) for p in positions], repeat=1) / polls
+            if kind == 'log':
+                top = lambda: [list(ledger.iter_timeline(p, limit=limit)) for p in positions]
+                timings['top'] = _timeit(top, repeat=1) / polls
+            del ledger
+        
+        results.append({
+            'events': count,
+            'scan_ms': timings['dicts'] * 1000,
+            'indexed_ms': timings['log'] * 1000,
+            'top_k_ms': timings['top'] * 1000,
+            'limit': limit
+        })
+    
+    return results
+
+def bench_dedup(count=100000, seed=0):
+    """Rebroadcast duplicates dropped per second, from the seen cache and from the id table"""
+    import consensus as spacetime
+    
+    events = list(_consensus_events(count, random.Random(seed)))
+    ledger = spacetime.SpacetimeConsensus()
+    for event in events:
+        ledger._update_light_cones(ledger._append(event))
+        ledger._remember(event['id'])
+    
+    recent = events[-spacetime.SEEN_EVENTS:]
+    older = events[:count - spacetime.SEEN_EVENTS] or events
+    cached_s = _timeit(lambda: [ledger.receive_event(event) for event in recent], repeat=1)
+    table_s = _timeit(lambda: [ledger.receive_event(event) for event in older], repeat=1)
+    return {
+        'events': count,
+        'cached_per_s': len(recent) / cached_s,
+        'table_per_s': len(older) / table_s,
+        'applied': len(ledger.log) - count
+    }
+
+def bench_restart(event_counts=(10000, 100000, 1000000), seed=0):
+    """Time from reopening a PersistentConsensus to its first get_consensus answer"""
+    import shutil
+    import tempfile
+    import persistent
+    
+    results = []
+    for count in event_counts:
+        directory = tempfile.mkdtemp(prefix='dmct-bench-')
+        try:
+            with persistent.PersistentConsensus(directory, snapshot_every=count) as ledger:
+                for event in _consensus_events(count, random.Random(seed)):
+                    ledger._update_light_cones(ledger._append(event))
+                key = ledger.log.key(0)
+            size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+            
+            start = time.perf_counter()
+            with persistent.PersistentConsensus(directory) as ledger:
+                ledger.get_consensus(key)
+                restart_s = time.perf_counter() - start
+                restored = len(ledger.log)
+        finally:
+            shutil.rmtree(directory)
+        
+        results.append({
+            'events': count,
+            'restart_s': restart_s,
+            'restored': restored,
+            'disk_mib': size / 2**20
+        })
+    
+    return results
+
+def bench_standing_waves(event_counts=(1000, 3000), seed=0):
+    """Memory behind one popular data key: event-id lists vs decayed StandingWave"""
+    results = []
+    for count in event_counts:
+        events = [dict(event, data='popular') for event in _consensus_events(count, random.Random(seed))]
+        result = {'events': count}
+        for kind in ('dicts', 'log'):
+            ledger = _ledger(kind)
+            for event in events:
+                ledger._check_interference(ledger._append(dict(event)))
+            wave = ledger.standing_waves['popular']
+            if kind == 'dicts':
+                result['pairs'] = len(wave['events'])
+                result['distinct'] = len(set(wave['events']))
+                result['list_kib'] = sys.getsizeof(wave['events']) / 1024
+            else:
+                result['wave_kib'] = (sys.getsizeof(wave.__dict__) + sys.getsizeof(wave.registers)) / 1024
+                result['estimate'] = wave.validators()
+            del ledger
+        results.append(result)
+    
+    return results
+
+def bench_consensus_poll(events=2000, polls=100000, seed=0):
+    """Polling get_consensus on a quiet key: rebuilt every time vs memoized per standing wave version"""
+    ledger = _ledger('log')
+    for event in _consensus_events(events, random.Random(seed)):
+        ledger._check_interference(ledger._append(event))
+    key = ledger.log.key(0)
+    wave = ledger.standing_waves[key]
+    
+    rebuilt_s = _timeit(lambda: [ledger._consensus_state(wave) for _ in range(polls)], repeat=1)
+    memoized_s = _timeit(lambda: [ledger.get_consensus(key) for _ in range(polls)], repeat=1)
+    return {
+        'events': events,
+        'rebuilt_us': rebuilt_s / polls * 1e6,
+        'memoized_us': memoized_s / polls * 1e6,
+        'speedup': rebuilt_s / memoized_s
+    }
+
+def bench_finality(count=20000, probes=20, rate=1.0, seed=0):
+    """Ingest per event after a long, settled history: every event kept vs final events pruned"""
+    import consensus as spacetime
+    
+    events = list(_consensus_events(count + probes, random.Random(seed), rate=rate))
+    history, fresh = events[:count], events[count:]
+    results = []
+    for finality in (None, spacetime.FINALITY_HORIZON):
+        ledger = spacetime.SpacetimeConsensus(finality=finality)
+        for event in history:
+            ledger._update_light_cones(ledger._append(dict(event)))
+        # Settle every key outright rather than replay count^2 interference
+        for index, key in enumerate(ledger.log.payload_keys):
+            wave = ledger.standing_waves[key] = spacetime.StandingWave()
+            wave.add(2 * spacetime.CONSENSUS_THRESHOLD, (0.0, 0.0, 0.0), history[-1]['time'], index)
+        pruned = ledger.prune()
+        
+        start = time.perf_counter()
+        for event in fresh:
+            ledger.receive_event(dict(event))
+        results.append({
+            'history': count,
+            'finality': finality,
+            'hot': len(ledger.log) - probes,
+            'pruned': pruned,
+            'ms_per_event': (time.perf_counter() - start) / probes * 1000
+        })
+        del ledger
+    
+    return results
+
+def _loop_field(ledger, resolution):
+    """The pre-tile visualize_consensus_field: every pixel against every event"""
+    field = [[0.0 for _ in range(resolution)] for _ in range(resolution)]
+    for i in range(resolution):
+        for j in range(resolution):
+            x = (i / resolution - 0.5) * 20
+            y = (j / resolution - 0.5) * 20
+            for event in ledger.events:
+                distance = math.sqrt((x - event['position'][0])**2 + (y - event['position'][1])**2)
+                field[i][j] += event['amplitude'] * math.exp(-distance / 5.0) * math.cos(2 * math.pi * distance)
+    return field
+
+def bench_render(events=2000, resolutions=(50, 200), loop_limit=50, extent=200.0, seed=0):
+    """visualize_consensus_field over a busy field: pixel loop vs culled, cached tiles"""
+    rng = random.Random(seed)
+    history = [
+        dict(event, position=(rng.uniform(-extent, extent), rng.uniform(-extent, extent), 0.0))
+        for event in _consensus_events(events + 2, rng)
+    ]
+    dicts, ledger = _ledger('dicts'), _ledger('log')
+    for event in history[:events]:
+        dicts._append(dict(event))
+        ledger._append(dict(event))
+    far, near = history[events:]
+    far['position'] = (extent * 2, extent * 2, 0.0)
+    near['position'] = (0.0, 0.0, 0.0)
+    
+    results = []
+    for resolution in resolutions:
+        result = {'events': events, 'resolution': resolution}
+        if resolution <= loop_limit:
+            result['loop_s'] = _timeit(lambda: _loop_field(dicts, resolution), repeat=1)
+        
+        render = lambda: ledger.visualize_consensus_field(resolution)
+        ledger.renderer.tiles.clear()
+        result['cold_s'] = _timeit(render, repeat=1)
+        result['warm_s'] = _timeit(render, repeat=1)
+        results.append(result)
+    
+    # One event far outside the view leaves every tile cached, one in the middle does not
+    for label, event in (('far_edit_s', far), ('near_edit_s', near)):
+        ledger._append(dict(event))
+        results[-1][label] = _timeit(lambda: ledger.visualize_consensus_field(resolutions[-1]), repeat=1)
+    
+    return results
+
+def bench_batch_submit(history_counts=(1000, 10000), batch=200, seed=0):
+    """Events per second for one gossip round: submit_event each vs one submit_events, in memory and on disk"""
+    import shutil
+    import tempfile
+    import consensus as spacetime
+    import persistent
+    
+    results = []
+    for count in history_counts:
+        history = list(_consensus_events(count, random.Random(seed)))
+        rng = random.Random(seed + 1)
+        round_ = [((rng.uniform(0, 100), rng.uniform(0, 100), rng.uniform(0, 100)), {'tx': i % 100})
+                  for i in range(batch)]
+        
+        for store in ('memory', 'disk'):
+            result = {'events': count, 'batch': batch, 'store': store}
+            for mode in ('single', 'batch'):
+                directory = tempfile.mkdtemp(prefix='dmct-bench-')
+                try:
+                    if store == 'memory':
+                        ledger = spacetime.SpacetimeConsensus()
+                    else:
+                        ledger = persistent.PersistentConsensus(directory, snapshot_every=count + batch * 2)
+                    for event in history:
+                        ledger._append(dict(event))
+                    ledger._update_light_cones(len(ledger.log) - 1)
+                    
+                    start = time.perf_counter()
+                    if mode == 'single':
+                        for position, data in round_:
+                            ledger.submit_event(position, data)
+                    else:
+                        ledger.submit_events(round_)
+                    result[f'{mode}_per_s'] = batch / (time.perf_counter() - start)
+                    if store == 'disk':
+                        ledger.close()
+                finally:
+                    shutil.rmtree(directory)
+            
+            result['speedup'] = result['batch_per_s'] / result['single_per_s']
+            results.append(result)
+    
+    return results
+
+def _case(name, params, setup, op, iterations, rounds=5):
+    """
+    Time `iterations` calls of op(state) one by one after setup(), in
+    several rounds with the collector off as timeit does, and report the
+    median of each figure over the rounds; then repeat once under
+    tracemalloc for the peak memory.
+    """
+    totals, p50s, p99s = [], [], []
+    for _ in range(rounds):
+        state = setup()
+        latencies = []
+        gc.collect()
+        gc.disable()
+        try:
+            for i in range(iterations):
+                start = time.perf_counter()
+                op(state, i)
+                latencies.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+        latencies.sort()
+        totals.append(sum(latencies))
+        p50s.append(latencies[len(latencies) // 2])
+        p99s.append(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))])
+    
+    tracemalloc.start()
+    state = setup()
+    for i in range(iterations):
+        op(state, i)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    total = statistics.median(totals)
+    return {
+        'name': name,
+        'params': params,
+        'iterations': iterations,
+        'ops_per_s': iterations / total if total else float('inf'),
+        'p50_ms': statistics.median(p50s) * 1000,
+        'p99_ms': statistics.median(p99s) * 1000,
+        'peak_kib': peak / 1024
+    }
+
+def _case_key(case):
+    return case['name'] + ''.join(f" {k}={v}" for k, v in sorted(case['params'].items()))
+
+def core_suite(node_counts=(100, 1000), wave_counts=(100, 1000, 10000), densities=(4, 16), seed=0):
+    """ops/s, p50/p99 latency and peak memory for the trust core primitives"""
+    cases = []
+    
+    def wave_setup(count):
+        def setup():
+            waves = _random_waves(count, random.Random(seed))
+            return waves, dmct.WaveStore(waves), dmct.SpacetimePoint(0, 0, 0, time.time())
+        return setup
+    
+    for count in wave_counts:
+        cases.append(_case('TrustWave.field_at', {'waves': count}, wave_setup(count),
+                           lambda state, i: state[0][i % len(state[0])].field_at(state[2]),
+                           iterations=2000))
+        cases.append(_case('WaveStore.field_at', {'waves': count}, wave_setup(count),
+                           lambda state, i: state[1].field_at(state[2]),
+                           iterations=max(5, 20000 // count)))
+    
+    for count in node_counts:
+        for density in densities:
+            params = {'nodes': count, 'neighbors': density}
+            
+            def network_setup(count=count, density=density):
+                return _sparse_network(count, dmct.PropagationExecutor(inline=True),
+                                       neighbors=density, seed=seed)
+            
+            cases.append(_case('Node.emit', params, network_setup,
+                               lambda network, i: network.nodes[i % len(network.nodes)].emit(amplitude=1.0),
+                               iterations=200))
+            cases.append(_case('Node.observe', params, network_setup,
+                               lambda network, i: network.nodes[i % len(network.nodes)].observe(),
+                               iterations=200))
+            
+            def build_setup(count=count, density=density):
+                reach = dmct.NEIGHBOR_RADIUS * 2
+                side = (count * 4 / 3 * math.pi * reach**3 / density) ** (1 / 3)
+                rng = random.Random(seed)
+                positions = [dmct.SpacetimePoint(rng.uniform(0, side), rng.uniform(0, side),
+                                                 rng.uniform(0, side)) for _ in range(count)]
+                return dmct.Network(dmct.PropagationExecutor(inline=True)), positions
+            
+            cases.append(_case('Network.add_node', params, build_setup,
+                               lambda state, i: state[0].add_node(dmct.Node(state[1][i], identity=i + 0.5)),
+                               iterations=count))
+    
+    def genesis_op(state, i):
+        with dmct.Simulation(seed=i):
+            dmct.genesis()
+    
+    cases.append(_case('dmct.genesis', {}, lambda: None, genesis_op, iterations=200))
+    return cases
+
+def compare(cases, baseline, tolerance=REGRESSION_TOLERANCE, timings=True, memory=True):
+    """Cases that are slower or hungrier than the baseline by more than tolerance"""
+    previous = {_case_key(case): case for case in baseline.get('cases', [])}
+    regressions = []
+    for case in cases:
+        before = previous.get(_case_key(case))
+        if not before:
+            continue
+        # p99 of microsecond operations is mostly scheduler noise, so it is
+        # recorded but not gated on; timings of sub-millisecond operations
+        # get a looser bound for the same reason
+        timing = tolerance if before['p50_ms'] >= 1.0 else max(tolerance, SUB_MS_TOLERANCE)
+        checks = []
+        if timings:
+            checks.append(('ops_per_s', case['ops_per_s'] < before['ops_per_s'] * (1 - timing)))
+            checks.append(('p50_ms', case['p50_ms'] > before['p50_ms'] * (1 + timing)))
+        if memory:
+            checks.append(('peak_kib', case['peak_kib'] > before['peak_kib'] * (1 + tolerance)))
+        for metric, worse in checks:
+            if worse:
+                regressions.append({'case': _case_key(case), 'metric': metric,
+                                    'baseline': before[metric], 'current': case[metric]})
+    return regressions
+
+def run_suite(output=RESULTS_FILE, baseline_file=BASELINE_FILE, save_baseline=False,
+              tolerance=REGRESSION_TOLERANCE, reference=False):
+    """
+    Run the core suite and check it against the baseline. A baseline saved
+    as a reference is only held to for peak memory, which is the same on
+    any host with the same Python; timings only mean something against a
+    baseline saved on the host that runs the suite.
+    """
+    cases = core_suite()
+    report = {
+        'created': time.time(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'timings': not reference,  # Whether later runs are held to these timings
+        'cases': cases
+    }
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    
+    print("📊 DMCT core suite\n")
+    for case in cases:
+        print(f"  {_case_key(case):<48} {case['ops_per_s']:>12.0f} ops/s | p50 {case['p50_ms']:8.3f} ms | "
+              f"p99 {case['p99_ms']:8.3f} ms | peak {case['peak_kib']:9.1f} KiB")
+    print(f"\n  Results written to {output}")
+    
+    if save_baseline or reference:
+        with open(baseline_file, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"  {'Reference' if reference else 'Baseline'} saved to {baseline_file}")
+        return 0
+    
+    if not os.path.exists(baseline_file):
+        # Nothing checked is not a pass
+        print(f"  ❌ No baseline at {baseline_file} (create one with --save-baseline)")
+        return MISSING_BASELINE
+    
+    with open(baseline_file) as f:
+        baseline = json.load(f)
+    timings = baseline.get('timings', True)
+    memory = (baseline.get('python'), baseline.get('machine')) == (report['python'], report['machine'])
+    if not memory:
+        print(f"  Peak memory not checked: the baseline is from Python {baseline.get('python')} "
+              f"on {baseline.get('machine')}")
+    if not timings:
+        print("  Timings not checked: the baseline is a reference from another host "
+              "(save one here with --save-baseline)")
+    if not (timings or memory):
+        print("  ❌ Nothing in the baseline applies to this run")
+        return MISSING_BASELINE
+    
+    regressions = compare(cases, baseline, tolerance, timings, memory)
+    if not regressions:
+        print("  ✅ No regressions against the baseline")
+        return 0
+    
+    print(f"  ❌ {len(regressions)} regression(s) against the baseline:")
+    for r in regressions:
+        print(f"     {r['case']}: {r['metric']} {r['baseline']:.3f} -> {r['current']:.3f}")
+    return 1
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'suite':
+        tolerance = REGRESSION_TOLERANCE
+        for arg in sys.argv[2:]:
+            if arg.startswith('--tolerance='):
+                tolerance = float(arg.split('=', 1)[1])
+        sys.exit(run_suite(save_baseline='--save-baseline' in sys.argv, tolerance=tolerance,
+                           reference='--save-reference' in sys.argv))
+    
+    print("⏱️  DMCT field evaluation: per-wave loop vs WaveStore\n")
+    for r in bench_field():
+        print(f"  {r['waves']:>7} waves | loop {r['loop_s']*1000:9.2f} ms | "
+              f"batched {r['batched_s']*1000:9.2f} ms | {r['speedup']:.1f}x")
+    
+    print("\n🌊 Wave propagation: deliveries per second\n")
+    for r in bench_propagation():
+        print(f"  {r['nodes']:>5} nodes | {r['executor']:<20} | "
+              f"{r['deliveries']:>6} deliveries | {r['deliveries_per_s']:>10.0f}/s")
+    
+    print("\n🗺️  Network construction: linear scan vs spatial grid\n")
+    for r in bench_network_build():
+        print(f"  {r['nodes']:>7} nodes | {r['index']:<5} | {r['seconds']:8.2f} s | "
+              f"{r['avg_neighbors']:.1f} neighbors/node")
+    
+    print("\n⌛ Wave expiry: 60 days of history\n")
+    r = bench_expiry()
+    print(f"  {r['waves']} waves | {r['expired']} expired in {r['expire_seconds']*1000:.1f} ms | "
+          f"{r['reclaimed_bytes'] / 2**20:.1f} MiB reclaimed")
+    print(f"  field_at {r['field_all_s']*1000:.1f} ms -> {r['field_wheel_s']*1000:.1f} ms | "
+          f"error {r['field_error']:.2e}")
+    
+    print("\n🌀 Phasor aggregation vs exact per-wave sum\n")
+    for r in bench_phasor():
+        print(f"  {r['waves']:>7} waves / {r['sources']} sources | exact {r['exact_s']*1000:8.2f} ms | "
+              f"phasor {r['phasor_s']*1000:6.3f} ms | {r['speedup']:.0f}x | "
+              f"error {r['max_relative_error']:.1e}")
+    
+    print("\n⛈️  Cascade storm: one emission into a primed network\n")
+    for r in bench_cascade():
+        print(f"  {r['nodes']:>6} nodes | {r['deliveries']:>7} deliveries | {r['cascades']:>6} cascades | "
+              f"{r['cascades_suppressed']:>6} suppressed | {r['seconds']:.2f} s")
+    
+    print("\n🕰️  Discrete-event simulation\n")
+    r = bench_simulation()
+    print(f"  {r['simulated_s']} s simulated in {r['wall_s']:.2f} s ({r['speedup']:.0f}x) | "
+          f"{r['events']} events | {r['nodes']} nodes | replay {'exact' if r['replayed'] else 'DIVERGED'}")
+    
+    print("\n📸 Per-tick network state: full, delta, totals\n")
+    for r in bench_snapshot():
+        print(f"  {r['nodes']:>6} nodes | visualize {r['visualize_s']*1000:8.2f} ms | "
+              f"snapshot {r['snapshot_s']*1000:6.2f} ms ({r['changed_nodes']} changed) | "
+              f"totals {r['totals_s']*1e6:5.1f} µs")
+    
+    print("\n🧩 Sharded network scaling\n")
+    for r in bench_sharded():
+        print(f"  {r['workers']} workers | {r['nodes']} nodes | build {r['build_s']:6.2f} s | "
+              f"pulse {r['pulse_s']:6.2f} s | {r['halo_messages']} halo messages")
+    
+    print("\n🎼 Consensus interference check per submit\n")
+    for r in bench_interference():
+        print(f"  {r['events']:>7} events | loop {r['loop_ms']:8.2f} ms | "
+              f"columns {r['batched_ms']:8.2f} ms | {r['speedup']:.1f}x")
+    
+    print("\n🗃️  Consensus memory per event\n")
+    for r in bench_event_memory():
+        print(f"  {r['events']} events, {r['distinct']:>6} payloads | dicts {r['dicts_bytes']:.0f} B | "
+              f"columns {r['log_bytes']:.0f} B | {r['ratio']:.1f}x smaller")
+    
+    print("\n🖼️  Consensus field render\n")
+    for r in bench_render():
+        line = f"  {r['events']} events at {r['resolution']:>3}² |"
+        if 'loop_s' in r:
+            line += f" loop {r['loop_s']:7.2f} s |"
+        line += f" tiles cold {r['cold_s']:6.2f} s, cached {r['warm_s']*1000:6.2f} ms"
+        if 'far_edit_s' in r:
+            line += f" | after far edit {r['far_edit_s']*1000:.2f} ms, near edit {r['near_edit_s']:.2f} s"
+        print(line)
+    
+    print("\n🔭 Timeline poll\n")
+    for r in bench_timeline():
+        print(f"  {r['events']:>7} events | scan+sort {r['scan_ms']:8.2f} ms | "
+              f"get_timeline {r['indexed_ms']:8.2f} ms | iter_timeline top {r['limit']} {r['top_k_ms']:6.2f} ms")
+    
+    print("\n🪞 Duplicate rebroadcasts dropped\n")
+    r = bench_dedup()
+    print(f"  {r['events']} known events | seen cache {r['cached_per_s']:,.0f}/s | "
+          f"id table {r['table_per_s']:,.0f}/s | {r['applied']} reapplied")
+    
+    print("\n💾 Restart from disk\n")
+    for r in bench_restart():
+        print(f"  {r['events']:>8} events ({r['disk_mib']:6.1f} MiB on disk) | "
+              f"serving again in {r['restart_s']:.2f} s")
+    
+    print("\n🎻 Standing wave for one popular key\n")
+    for r in bench_standing_waves():
+        print(f"  {r['events']:>5} events | {r['pairs']:>8} pairs in {r['list_kib']:8.1f} KiB | "
+              f"StandingWave {r['wave_kib']:.2f} KiB | validators {r['distinct']} exact, {r['estimate']} sketched")
+    
+    print("\n🔔 get_consensus poll on an unchanged key\n")
+    r = bench_consensus_poll()
+    print(f"  {r['events']} events | rebuilt {r['rebuilt_us']:.2f} µs | "
+          f"memoized {r['memoized_us']:.2f} µs | {r['speedup']:.0f}x")
+    
+    print("\n🏁 Ingest after a settled history\n")
+    for r in bench_finality():
+        horizon = 'keep everything' if r['finality'] is None else f"finality {r['finality']:.0f} s"
+        print(f"  {r['history']} events, {horizon:<16} | {r['hot']:>6} hot, {r['pruned']:>6} checkpointed | "
+              f"{r['ms_per_event']:7.2f} ms/event")
+    
+    print("\n📦 Batch submit: one gossip round\n")
+    for r in bench_batch_submit():
+        print(f"  {r['events']:>6} events + {r['batch']} | {r['store']:<6} | "
+              f"submit_event {r['single_per_s']:9,.0f}/s | submit_events {r['batch_per_s']:9,.0f}/s | "
+              f"{r['speedup']:.1f}x")
+    
+    print("\n🩹 Partition healing: merge_timelines\n")
+    for r in bench_merge():
+        print(f"  {r['events']:>8} shared events | {r['merge']:<11} | {r['seconds']:8.3f} s | "
+              f"{r['merged']} events after merge")
+    
+    print("\n🕸️  Healing many replicas at once\n")
+    for r in bench_merge_replicas():
+        print(f"  {r['replicas']:>3} replicas, {r['unique']} unique events | chained {r['chained_s']:6.2f} s | "
+              f"merge_replicas {r['k-way_s']:6.2f} s | with a pool {r['pool_s']:6.2f} s")
+    
+    print("\n⏳ Causality on a long-running node\n")
+    r = bench_causality()
+    print(f"  {r['events']} events | {r['edges']:,} edges in {r['dicts_mib']:.1f} MiB | "
+          f"index {r['log_mib']:.2f} MiB | is_causal {r['is_causal_us']:.1f} µs | future_of {r['future_of_ms']:.1f} ms")
+    
+    print("\n📶 UDP ingest over loopback\n")
+    for r in bench_udp():
+        offered = 'flood' if r['rate'] is None else f"{r['rate']}/s"
+        print(f"  {offered:>7} | {r['node']:<7} | {r['processed']:>6} of {r['sent']} waves | {r['per_s']:8,.0f}/s | "
+              f"latency p50 {r['p50_ms']:7.1f} ms, p99 {r['p99_ms']:7.1f} ms")
+    
+    print("\n💡 Consensus light-cone upkeep per event\n")
+    for r in bench_light_cones():
+        line = f"  {r['events']:>8} events | {r['index']:<4} | {r['us_per_event']:9.2f} µs/event"
+        if 'query_ms' in r:
+            line += f" | cone query {r['query_ms']:.1f} ms ({r['cone_size']:.0f} events)"
+        print(line)
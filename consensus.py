@@ -4,21 +4,696 @@ DMCT Consensus: Truth Through Interference Patterns
 "When waves align, consensus emerges like starlight through chaos."
 """
 
+import asyncio
+import bisect
+import heapq
+import itertools
+import json
 import math
+import multiprocessing
+import os
 import time
+from array import array
+from collections import Counter, OrderedDict
+from collections.abc import Mapping, Sequence
+from hashlib import blake2b
 from typing import Dict, List, Tuple, Optional
 
+CONE_SLOT = 1.0   # Seconds of event time per index bucket
+CONE_CELL = 4.0   # Spatial cell size inside a bucket
+FIELD_CUTOFF = 1e-6  # Field contributions below this fraction of an event's amplitude are culled
+FIELD_TILE = 16   # Grid points per side of a rendered tile
+FIELD_TILES = 4096  # Tiles kept in the render cache
+SEEN_EVENTS = 65536  # Recent event ids kept for dropping duplicates
+INTERN_VARIANTS = 4  # Unequal payloads with one encoding that still get interned
+STANDING_WAVE_DECAY = 3600.0  # Seconds of event time for a standing wave to fade by 1/e
+REGISTER_BITS = 8  # 2^8 HyperLogLog registers per standing wave, about 6.5% error
+VALIDATOR_REGISTERS = 1 << REGISTER_BITS
+CONSENSUS_THRESHOLD = 3.0  # Standing wave amplitude at which a key is confirmed
+SUBSCRIPTION_DELTA = 0.05  # Confidence change that wakes a subscriber
+FINALITY_HORIZON = 3600.0  # Suggested finality: seconds of event time after which a confirmed key's events are final
+PRUNE_EVERY = 1000  # Events ingested between finality checks
+MERGE_POOL_WORK = 1000000  # Merged events times logged events past which a merge starts a process pool
+
+class EventLog:
+    """
+    The event history as fixed-width columns, one row per event in
+    submission order. Ids are stored as 64-bit integers and found through
+    an open-addressing table. Each distinct payload is stored once in a
+    payload table that the rows point into.
+    """
+    
+    COLUMNS = ('x', 'y', 'z', 't', 'amplitude', 'confirmations', 'ids', 'payload')
+    
+    def __init__(self):
+        self.x = array('d')
+        self.y = array('d')
+        self.z = array('d')
+        self.t = array('d')
+        self.amplitude = array('d')
+        self.confirmations = array('d')
+        self.ids = array('Q')
+        self.payload = array('I')  # row -> payload table index
+        self.payloads = []  # Interned data values
+        self.payload_keys = []  # Standing-wave key of each payload
+        self.interned = {}  # payload_token(data) -> payload table index
+        self.table = array('i', [0]) * 16  # id slot -> row + 1
+        
+    def __len__(self):
+        return len(self.ids)
+    
+    def _slot(self, key):
+        """Table slot holding key, or the empty slot where it belongs"""
+        table = self.table
+        mask = len(table) - 1
+        i = ((key * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32 & mask
+        while True:
+            row = table[i] - 1
+            if row < 0 or self.ids[row] == key:
+                return i
+            i = (i + 1) & mask
+            
+    def find(self, event_id):
+        """Row of the latest event with this id, or None"""
+        try:
+            key = int(event_id, 16)
+        except ValueError:
+            return None
+        row = self.table[self._slot(key)] - 1
+        return row if row >= 0 else None
+    
+    def intern(self, data, key):
+        """Payload table index for data, adding it on first sight"""
+        token = payload_token(data)
+        for slot in self._slots(token):
+            index = self.interned.get(slot)
+            if index is None:
+                break
+            if _same(self.payloads[index], data):
+                return index
+        return self.store(data, key, token)
+    
+    def store(self, data, key, token=None):
+        """Add data to the payload table, findable if a slot is free; returns its index"""
+        index = len(self.payloads)
+        for slot in self._slots(payload_token(data) if token is None else token):
+            if slot not in self.interned:
+                self.interned[slot] = index
+                break
+        self.payloads.append(data)
+        self.payload_keys.append(key)
+        return index
+    
+    def _slots(self, token):
+        # Unequal payloads can share an encoding (a tuple and a list, say);
+        # the first few get a slot each, any more are stored but not interned
+        yield token
+        for variant in range(1, INTERN_VARIANTS):
+            yield token + bytes([variant])
+    
+    def append(self, event_id, position, event_time, payload, amplitude, confirmations=0):
+        """Add a row; returns its index"""
+        row = len(self.ids)
+        x, y, z = (tuple(position) + (0.0, 0.0, 0.0))[:3]
+        self.x.append(x)
+        self.y.append(y)
+        self.z.append(z)
+        self.t.append(event_time)
+        self.amplitude.append(amplitude)
+        self.confirmations.append(confirmations)
+        self.payload.append(payload)
+        
+        key = int(event_id, 16)
+        self.ids.append(key)
+        self.table[self._slot(key)] = row + 1
+        if len(self.ids) * 3 > len(self.table) * 2:
+            self._grow()
+        return row
+    
+    def _grow(self):
+        self._rehash(len(self.table) * 2)
+        
+    def _rehash(self, size):
+        self.table = array('i', [0]) * size
+        for row in range(len(self.ids)):
+            self.table[self._slot(self.ids[row])] = row + 1
+            
+    def take(self, rows):
+        """A new log of just these rows, in this order, sharing the payload table"""
+        log = EventLog()
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            setattr(log, name, array(column.typecode, [column[row] for row in rows]))
+        log.payloads, log.payload_keys, log.interned = self.payloads, self.payload_keys, self.interned
+        
+        size = len(log.table)
+        while len(log.ids) * 3 > size * 2:
+            size *= 2
+        log._rehash(size)
+        return log
+            
+    def id(self, row):
+        return format(self.ids[row], '016x')
+    
+    def position(self, row):
+        return (self.x[row], self.y[row], self.z[row])
+    
+    def data(self, row):
+        return self.payloads[self.payload[row]]
+    
+    def key(self, row):
+        return self.payload_keys[self.payload[row]]
+    
+    def event(self, row):
+        """One row as the event dict submit_event used to store"""
+        return {
+            'id': self.id(row),
+            'position': self.position(row),
+            'time': self.t[row],
+            'data': self.data(row),
+            'amplitude': self.amplitude[row],
+            'confirmations': self.confirmations[row]
+        }
+    
+    def phases(self, position, t, c, rows=None):
+        """Phase difference of every logged event, or the first `rows`, against an event at (position, t)"""
+        px, py, pz = (tuple(position) + (0.0, 0.0, 0.0))[:3]
+        two_pi = 2 * math.pi
+        sqrt = math.sqrt
+        columns = zip(self.x, self.y, self.z, self.t)
+        if rows is not None:
+            columns = itertools.islice(columns, rows)
+        # Same arithmetic, in the same order, as _calculate_phase_difference
+        return [
+            (two_pi * (sqrt(sum(((x - px)**2, (y - py)**2, (z - pz)**2))) - c * abs(t - et))) % two_pi
+            for x, y, z, et in columns
+        ]
+    
+class EventView(Sequence):
+    """
+    Read-only list of event dicts over an EventLog, for code that still
+    reads consensus.events. Each dict is built on access, so changing it
+    does not change the log.
+    """
+    
+    def __init__(self, log):
+        self.log = log
+        
+    def __len__(self):
+        return len(self.log)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.log.event(row) for row in range(*index.indices(len(self.log)))]
+        if index < 0:
+            index += len(self.log)
+        if not 0 <= index < len(self.log):
+            raise IndexError('event index out of range')
+        return self.log.event(index)
+    
+class CausalIndex:
+    """
+    Event rows filed by time slot, and within a slot by spatial cell.
+    Filing an event is O(1). A light-cone query opens only the cells
+    that the cone can reach in each slot.
+    """
+    
+    def __init__(self, log, distance, c=1.0, slot=CONE_SLOT, cell=CONE_CELL):
+        self.log = log
+        self.distance = distance
+        self.c = c
+        self.slot = slot
+        self.cell = cell
+        self.buckets = {}  # time slot -> {cell: array of rows}
+        self.slots = []  # Occupied time slots, sorted
+        self.latest = {}  # time slot -> highest row filed in it
+        self.filed = 0
+        
+    def _cell(self, position):
+        return tuple(math.floor(v / self.cell) for v in position)
+    
+    def sync(self):
+        """File events logged since the last call"""
+        for row in range(self.filed, len(self.log)):
+            self.insert(row)
+        self.filed = len(self.log)
+        
+    def insert(self, row):
+        """File a logged event"""
+        slot = math.floor(self.log.t[row] / self.slot)
+        bucket = self.buckets.get(slot)
+        if bucket is None:
+            bucket = self.buckets[slot] = {}
+            if self.slots and slot < self.slots[-1]:
+                bisect.insort(self.slots, slot)
+            else:
+                self.slots.append(slot)
+        self.latest[slot] = row  # Rows are filed in order
+                
+        cell = self._cell(self.log.position(row))
+        rows = bucket.get(cell)
+        if rows is None:
+            rows = bucket[cell] = array('l')
+        rows.append(row)
+        
+    def cone(self, position, t, after=-1):
+        """Yield the row of every logged event causally connected to (position, t), skipping rows up to after"""
+        self.sync()
+        log = self.log
+        center = self._cell(position)
+        for slot in self.slots:
+            if self.latest[slot] <= after:
+                continue  # Nothing filed here since
+            start = slot * self.slot
+            reach = self.c * max(abs(t - start), abs(t - start - self.slot))
+            span = math.floor(reach / self.cell) + 1
+            bucket = self.buckets[slot]
+            
+            if (2 * span + 1) ** len(center) < len(bucket):
+                cells = (bucket.get(tuple(a + d for a, d in zip(center, offset)))
+                         for offset in self._offsets(span, len(center)))
+            else:
+                cells = (rows for key, rows in bucket.items()
+                         if all(abs(k - a) <= span for k, a in zip(key, center)))
+                
+            for rows in cells:
+                if not rows or rows[-1] <= after:
+                    continue
+                for i in range(bisect.bisect_right(rows, after), len(rows)):
+                    row = rows[i]
+                    if self.distance(log.position(row), position) <= self.c * abs(t - log.t[row]):
+                        yield row
+                        
+    def connected(self, row, other):
+        """Whether other was submitted after row and lies inside its light cone"""
+        if other <= row:
+            return False
+        log = self.log
+        return self.distance(log.position(row), log.position(other)) <= self.c * abs(log.t[row] - log.t[other])
+                        
+    def _offsets(self, span, dims):
+        if dims == 0:
+            yield ()
+            return
+        for rest in self._offsets(span, dims - 1):
+            for d in range(-span, span + 1):
+                yield rest + (d,)
+                
+    def future(self, row):
+        """Rows submitted after row that lie inside its light cone, in order"""
+        return sorted(self.cone(self.log.position(row), self.log.t[row], after=row))
+    
+class LightCones(Mapping):
+    """
+    Causal relationships as event id -> later events inside its light cone.
+    Worked out from the index when asked for, so keeping them is O(1) per event.
+    """
+    
+    def __init__(self, index):
+        self.index = index
+        
+    def __getitem__(self, event_id):
+        log = self.index.log
+        row = log.find(event_id)
+        future = [] if row is None else self.index.future(row)
+        if not future:
+            raise KeyError(event_id)
+        return [log.id(r) for r in future]
+    
+    def __contains__(self, event_id):
+        # Stops at the first later event instead of collecting the cone
+        log = self.index.log
+        row = log.find(event_id)
+        return row is not None and any(True for _ in self.index.cone(log.position(row), log.t[row], after=row))
+    
+    def __iter__(self):
+        log = self.index.log
+        for row in range(len(log)):
+            event_id = log.id(row)
+            if log.find(event_id) != row:
+                continue  # A later event reused this id; it answers for it
+            if any(True for _ in self.index.cone(log.position(row), log.t[row], after=row)):
+                yield event_id
+                
+    def __len__(self):
+        return sum(1 for _ in self)
+    
+class TimeIndex:
+    """
+    Event rows sorted by event time, plus the bounding box of their
+    positions. A past-light-cone scan bisects to the present and walks
+    back in time, and the box bounds how far back it has to look.
+    """
+    
+    def __init__(self, log):
+        self.log = log
+        self.times = array('d')
+        self.rows = array('l')
+        self.low = [math.inf] * 3
+        self.high = [-math.inf] * 3
+        self.filed = 0
+        
+    def sync(self):
+        """File events logged since the last query"""
+        log = self.log
+        for row in range(self.filed, len(log)):
+            t = log.t[row]
+            if not self.times or t >= self.times[-1]:
+                self.times.append(t)
+                self.rows.append(row)
+            else:
+                i = bisect.bisect_right(self.times, t)
+                self.times.insert(i, t)
+                self.rows.insert(i, row)
+            for axis, v in enumerate(log.position(row)):
+                self.low[axis] = min(self.low[axis], v)
+                self.high[axis] = max(self.high[axis], v)
+        self.filed = len(log)
+        
+    def reach(self, position):
+        """Upper bound on the distance from position to any filed event"""
+        padded = (tuple(position) + (0.0, 0.0, 0.0))[:3]
+        return math.sqrt(sum(max(abs(p - lo), abs(p - hi))**2
+                             for p, lo, hi in zip(padded, self.low, self.high)))
+    
+class FieldRenderer:
+    """
+    Draws the 2D consensus field slice tile by tile. Events are filed in an
+    (x, y) grid of cells and every cell counts its changes, so a cached tile
+    is reused until a cell within culling reach of it changes.
+    """
+    
+    def __init__(self, log, cutoff=FIELD_CUTOFF, tile=FIELD_TILE, capacity=FIELD_TILES):
+        self.log = log
+        self.reach = 5.0 * math.log(1.0 / cutoff)  # exp(-d/5) drops below cutoff past this
+        self.tile = tile
+        self.capacity = capacity
+        self.cells = {}  # (i, j) -> array of rows
+        self.changes = {}  # (i, j) -> edits to that cell so far
+        self.filed = 0
+        self.tiles = OrderedDict()  # (region, resolution, version) -> values
+        self.hits = 0
+        self.misses = 0
+        
+    def _cell(self, x, y):
+        return (math.floor(x / self.reach), math.floor(y / self.reach))
+    
+    def sync(self):
+        """File events logged since the last render"""
+        log = self.log
+        for row in range(self.filed, len(log)):
+            cell = self._cell(log.x[row], log.y[row])
+            rows = self.cells.get(cell)
+            if rows is None:
+                rows = self.cells[cell] = array('l')
+            rows.append(row)
+            self.changes[cell] = self.changes.get(cell, 0) + 1
+        self.filed = len(log)
+        
+    def _near(self, x0, y0, x1, y1):
+        """Cells holding events that can reach the box (x0, y0)-(x1, y1)"""
+        i0, j0 = self._cell(x0 - self.reach, y0 - self.reach)
+        i1, j1 = self._cell(x1 + self.reach, y1 + self.reach)
+        return [(i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)]
+    
+    def evaluate(self, xs, ys, rows):
+        """Field at every point of the grid xs × ys from the given event rows"""
+        log = self.log
+        sources = [(log.x[row], log.y[row], log.amplitude[row]) for row in sorted(rows)]
+        sqrt, exp, cos = math.sqrt, math.exp, math.cos
+        two_pi = 2 * math.pi
+        reach = self.reach
+        return [
+            [sum((amplitude * exp(-distance / 5.0) * cos(two_pi * distance)
+                  for distance, amplitude in ((sqrt((x - ex)**2 + (y - ey)**2), ea) for ex, ey, ea in sources)
+                  if distance <= reach), 0.0)
+             for y in ys]
+            for x in xs
+        ]
+    
+    def render(self, resolution, center=(0.0, 0.0), size=20.0):
+        """The resolution × resolution slice of side size around center"""
+        self.sync()
+        cx, cy = center
+        xs = [(i / resolution - 0.5) * size + cx for i in range(resolution)]
+        ys = [(j / resolution - 0.5) * size + cy for j in range(resolution)]
+        field = [[] for _ in range(resolution)]
+        
+        for ti in range(0, resolution, self.tile):
+            for tj in range(0, resolution, self.tile):
+                txs = xs[ti:ti + self.tile]
+                tys = ys[tj:tj + self.tile]
+                cells = self._near(txs[0], tys[0], txs[-1], tys[-1])
+                version = sum(self.changes.get(cell, 0) for cell in cells)
+                key = ((cx, cy, size, ti, tj), resolution, version)  # center may be any pair, a list included
+                
+                values = self.tiles.get(key)
+                if values is None:
+                    self.misses += 1
+                    values = self.evaluate(txs, tys, [row for cell in cells for row in self.cells.get(cell, ())])
+                    self.tiles[key] = values
+                    if len(self.tiles) > self.capacity:
+                        self.tiles.popitem(last=False)
+                else:
+                    self.hits += 1
+                    self.tiles.move_to_end(key)
+                    
+                for k, column in enumerate(values):
+                    field[ti + k].extend(column)
+                    
+        return field
+    
+def canonical(value):
+    """
+    value as plain JSON types, built the same way in every process. Dicts
+    with keys other than strings become sorted [key, value] pairs and sets
+    sorted lists, each tagged so they stay apart from a plain list; objects
+    are encoded by class and attributes rather than by a repr that may
+    hold a memory address.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [canonical(item) for item in value]
+    if isinstance(value, Mapping):
+        if all(isinstance(key, str) for key in value):
+            return {key: canonical(item) for key, item in value.items()}  # json sorts these
+        pairs = [[canonical(key), canonical(item)] for key, item in value.items()]
+        return {'__map__': sorted(pairs, key=lambda pair: _dumps(pair[0]))}
+    if isinstance(value, (set, frozenset)):
+        return {'__set__': sorted((canonical(item) for item in value), key=_dumps)}
+    if isinstance(value, (bytes, bytearray)):
+        return {'__bytes__': bytes(value).hex()}
+    kind = f"{type(value).__module__}.{type(value).__qualname__}"
+    if hasattr(value, '__dict__'):
+        return {'__object__': [kind, canonical(vars(value))]}
+    return {'__repr__': [kind, repr(value)]}  # Decimal, complex, datetime: reprs without addresses
+
+def _dumps(value):
+    return json.dumps(value, sort_keys=True, separators=(',', ':'))
+
+def encode(value) -> bytes:
+    """Canonical bytes of value: equal data gives equal bytes in any process"""
+    return _dumps(canonical(value)).encode()
+
+def payload_token(data) -> bytes:
+    """16-byte digest of data's canonical encoding, the key payloads are interned by"""
+    return blake2b(encode(data), digest_size=16).digest()
+
+def _same(a, b):
+    try:
+        return type(a) is type(b) and bool(a == b)
+    except Exception:
+        return False  # Comparisons that raise or give no single answer
+
+def sketch(event_id):
+    """HyperLogLog register and rank of an event id"""
+    # splitmix64 spreads any id over the registers
+    h = (event_id + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    h = ((h ^ (h >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    h = ((h ^ (h >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    h ^= h >> 31
+    rank = 64 - REGISTER_BITS - (h >> REGISTER_BITS).bit_length() + 1  # Leading zeros + 1
+    return h & (VALIDATOR_REGISTERS - 1), rank
+    
+class StandingWave:
+    """
+    One data key's consensus pattern in constant memory. Contributions
+    fade with event time, the events behind them are counted with a
+    HyperLogLog sketch, and the centre of mass is a decayed first moment.
+    """
+    
+    version = 0  # Bumped on every change; waves pickled before it start at 0
+    
+    def __init__(self, decay=STANDING_WAVE_DECAY):
+        self.decay = decay
+        self.amplitude = 0.0
+        self.moment = [0.0, 0.0, 0.0]  # Amplitude-weighted position sum
+        self.updated = -math.inf  # Event time the amplitude is valid at
+        self.registers = bytearray(VALIDATOR_REGISTERS)
+        
+    def add(self, strength, position, t, event_id):
+        """Fold in one constructive pair seen at event time t"""
+        self.extend(t, [(strength, position, sketch(event_id))])
+        
+    def extend(self, t, pairs):
+        """Fold in (strength, position, sketch) pairs seen at event time t, in order"""
+        late = 1.0
+        if t > self.updated:
+            if self.amplitude:
+                fade = math.exp((self.updated - t) / self.decay)
+                self.amplitude *= fade
+                self.moment = [m * fade for m in self.moment]
+            self.updated = t
+        elif t < self.updated:
+            late = math.exp((t - self.updated) / self.decay)
+            
+        amplitude = self.amplitude
+        mx, my, mz = self.moment
+        registers = self.registers
+        for strength, (x, y, z), (register, rank) in pairs:
+            if late != 1.0:
+                strength *= late
+            amplitude += strength
+            mx += strength * x
+            my += strength * y
+            mz += strength * z
+            if rank > registers[register]:
+                registers[register] = rank
+        self.amplitude = amplitude
+        self.moment = [mx, my, mz]
+        self.version += 1
+        
+    def validators(self):
+        """Approximate number of distinct events behind this wave"""
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / sum(2.0 ** -r for r in self.registers)
+        empty = self.registers.count(0)
+        if estimate <= 2.5 * m and empty:
+            estimate = m * math.log(m / empty)
+        return round(estimate)
+    
+    def center(self):
+        if not self.amplitude:
+            return [0.0, 0.0, 0.0]
+        return [m / self.amplitude for m in self.moment]
+    
+def interfere(log, position, t, amplitude, event_id, rows, c, waves, sketches=None):
+    """
+    Apply the constructive pairs between an event at (position, t) and the
+    first `rows` events of log: each hit gains the event's amplitude and
+    feeds its data key's StandingWave in waves. Returns the amplitude the
+    event received back and the keys whose waves changed.
+    """
+    phases = log.phases(position, t, c, rows)
+    strengths = list(map(abs, map(math.cos, phases)))
+    
+    # Constructive interference (consensus), applied in event order
+    ids = log.ids
+    hits = [i for i, strength in enumerate(strengths) if strength > 0.8 and ids[i] != event_id]
+    
+    amplitudes = log.amplitude
+    confirmations = log.confirmations
+    received = 0.0
+    payload, keys = log.payload, log.payload_keys
+    groups = {}
+    for i in hits:
+        confirmations[i] += amplitude
+        received += amplitudes[i]
+        groups.setdefault(keys[payload[i]], []).append(i)
+        
+    # Update standing wave patterns, one pass per data key; a batch
+    # passes its sketches along so each row's id is hashed once
+    if sketches is None:
+        sketches = {}
+    xs, ys, zs = log.x, log.y, log.z
+    for key, rows in groups.items():
+        wave = waves.get(key)
+        if wave is None:
+            wave = waves[key] = StandingWave()
+        pairs = []
+        for i in rows:
+            hashed = sketches.get(i)
+            if hashed is None:
+                hashed = sketches[i] = sketch(ids[i])
+            pairs.append((strengths[i], (xs[i], ys[i], zs[i]), hashed))
+        wave.extend(t, pairs)
+        
+    return received, list(groups)
+    
+def _merge_partition(task):
+    """
+    Pool worker for merge_replicas: interference of the merged events with
+    the rows of one partition of data keys. Returns the partition's
+    confirmations, what each merged event received from it, and its waves.
+    """
+    rows, log, arrivals, waves, c = task  # rows: the global row of each log row, ascending
+    received = []
+    sketches = {}
+    for row, position, t, amplitude, event_id in arrivals:
+        upto = bisect.bisect_right(rows, row)
+        amount, _ = interfere(log, position, t, amplitude, event_id, upto, c, waves, sketches)
+        if upto and rows[upto - 1] == row:
+            # The event's own partition: it is credited here, as submit_event would
+            log.confirmations[upto - 1] += amount
+            amount = 0.0
+        received.append(amount)
+    return log.confirmations, received, waves
+    
+class Subscription:
+    """A callback on one data key's consensus, from SpacetimeConsensus.subscribe"""
+    
+    def __init__(self, consensus, data_key, callback, delta):
+        self.consensus = consensus
+        self.data_key = data_key
+        self.callback = callback
+        self.delta = delta
+        state = consensus.get_consensus(data_key)
+        self.confirmed = bool(state and state['confirmed'])
+        self.confidence = state['confidence'] if state else 0.0  # As last reported
+        
+    def _update(self, state):
+        # Small drifts add up until they pass delta, then report in one go
+        if state['confirmed'] == self.confirmed and abs(state['confidence'] - self.confidence) <= self.delta:
+            return
+        self.confirmed = state['confirmed']
+        self.confidence = state['confidence']
+        self.callback(state)
+        
+    def cancel(self):
+        subscribers = self.consensus.subscriptions.get(self.data_key, [])
+        if self in subscribers:
+            subscribers.remove(self)
+        if not subscribers:
+            self.consensus.subscriptions.pop(self.data_key, None)
+            
 class SpacetimeConsensus:
     """
     Consensus mechanism based on wave interference patterns.
     No voting. No mining. Just physics.
     """
     
-    def __init__(self):
-        self.events = []  # [(position, time, data, amplitude)]
-        self.light_cones = {}  # Causal relationships
-        self.standing_waves = {}  # Consensus patterns
+    def __init__(self, finality: Optional[float] = None):
+        self.standing_waves = {}  # Consensus patterns: data key -> StandingWave
         self.c = 1.0  # Speed of trust (normalized)
+        self._attach(EventLog())
+        self.seen = OrderedDict()  # Recently seen event ids, oldest first
+        self.answers = {}  # data key -> (wave, version, get_consensus result)
+        self.subscriptions = {}  # data key -> [Subscription]
+        self.finality = finality  # Seconds until confirmed events are pruned; None keeps every event
+        self.checkpoints = {}  # data key -> summary of its pruned, final events
+        self.since_prune = 0
+        self.dropped_final = 0  # Incoming events refused because their key was final at their time
+        self.last_merge = {'merged': 0, 'dropped_final': 0}
+        
+    def _attach(self, log):
+        """Serve from log, with fresh indexes that file its rows on first use"""
+        self.log = log  # Columns of every event
+        self.events = EventView(log)  # [(position, time, data, amplitude)]
+        self.causal = CausalIndex(log, self._distance, self.c)
+        self.light_cones = LightCones(self.causal)  # Causal relationships
+        self.renderer = FieldRenderer(log)
+        self.timeline = TimeIndex(log)
         
     def submit_event(self, position: Tuple[float, float, float], 
                      data: any, amplitude: float = 1.0) -> str:
@@ -26,72 +701,112 @@ class SpacetimeConsensus:
         event_time = time.time()
         event_id = self._hash_event(position, event_time, data)
         
-        event = {
+        row = self._append({
             'id': event_id,
             'position': position,
             'time': event_time,
             'data': data,
             'amplitude': amplitude,
             'confirmations': 0
-        }
-        
-        self.events.append(event)
-        self._update_light_cones(event)
-        self._check_interference(event)
+        })
+        self._remember(event_id)
+        self._update_light_cones(row)
+        self._check_interference(row)
+        self._ingested(1)
         
         return event_id
     
+    def submit_events(self, events) -> List[str]:
+        """Submit a batch of (position, data) or (position, data, amplitude) events"""
+        # Everything is logged and filed first, then each event interferes
+        # with the rows that came before it, in order: the confirmations and
+        # standing waves come out exactly as from one submit_event per item
+        rows = []
+        for event in events:
+            position, data, amplitude = (tuple(event) + (1.0,))[:3]
+            event_time = time.time()
+            event_id = self._hash_event(position, event_time, data)
+            rows.append(self._append({
+                'id': event_id,
+                'position': position,
+                'time': event_time,
+                'data': data,
+                'amplitude': amplitude,
+                'confirmations': 0
+            }))
+            self._remember(event_id)
+        
+        if rows:
+            self._update_light_cones(rows[-1])
+        sketches = {}
+        for row in rows:
+            self._check_interference(row, sketches)
+        
+        ids = [self.log.id(row) for row in rows]
+        self._ingested(len(rows))
+        return ids
+    
+    def receive_event(self, event: Dict) -> bool:
+        """Apply an event rebroadcast by another replica; False if it is a duplicate"""
+        if self.checkpoints and self._finalized(self._get_data_key(event['data']), event['time']):
+            self.dropped_final += 1
+            return False  # Pruned as final before this copy arrived
+        if not self._is_new(event['id']):
+            return False
+        row = self._append(dict(event, confirmations=0))
+        self._update_light_cones(row)
+        self._check_interference(row)
+        self._ingested(1)
+        return True
+    
+    def _remember(self, event_id):
+        """Add an id to the bounded seen cache; False if it was already there"""
+        if event_id in self.seen:
+            self.seen.move_to_end(event_id)
+            return False
+        self.seen[event_id] = True
+        if len(self.seen) > SEEN_EVENTS:
+            self.seen.popitem(last=False)
+        return True
+    
+    def _is_new(self, event_id):
+        # The cache answers for recent ids, the log's id table for the rest
+        return self._remember(event_id) and self.log.find(event_id) is None
+    
+    def _append(self, event):
+        """Log an event dict; returns its row"""
+        payload = self.log.intern(event['data'], self._get_data_key(event['data']))
+        return self.log.append(event['id'], event['position'], event['time'], payload,
+                               event['amplitude'], event['confirmations'])
+    
     def _hash_event(self, position, time, data) -> str:
         """Generate deterministic event ID"""
-        content = f"{position}{time}{data}"
-        # Simple hash (in production, use proper cryptographic hash)
-        return hex(hash(content) & 0xffffffff)[2:]
+        # 8-byte BLAKE2b of a canonical encoding: the same event gets the
+        # same id in every process and on every replica
+        return blake2b(encode([list(position), time, data]), digest_size=8).hexdigest()
     
-    def _update_light_cones(self, new_event):
+    def _update_light_cones(self, row):
         """Update causal relationships based on light cones"""
-        for event in self.events[:-1]:  # All except the new one
-            # Check if events are causally connected
-            space_interval = self._distance(event['position'], new_event['position'])
-            time_interval = abs(new_event['time'] - event['time'])
-            
-            # Events are causally connected if within light cone
-            if space_interval <= self.c * time_interval:
-                if event['id'] not in self.light_cones:
-                    self.light_cones[event['id']] = []
-                self.light_cones[event['id']].append(new_event['id'])
+        # Events are causally connected if within light cone; the index
+        # answers that when light_cones is read, so filing is all we do here
+        self.causal.sync()
     
     def _distance(self, p1, p2) -> float:
         """Calculate Euclidean distance"""
         return math.sqrt(sum((a - b)**2 for a, b in zip(p1, p2)))
     
-    def _check_interference(self, new_event):
+    def _check_interference(self, row, sketches=None):
         """Check for constructive/destructive interference"""
-        interference_map = {}
-        
-        for event in self.events:
-            if event['id'] == new_event['id']:
-                continue
-                
-            # Calculate phase difference
-            phase_diff = self._calculate_phase_difference(event, new_event)
-            
-            # Constructive interference (consensus)
-            if abs(math.cos(phase_diff)) > 0.8:
-                event['confirmations'] += new_event['amplitude']
-                new_event['confirmations'] += event['amplitude']
+        log = self.log
+        # Only the events logged up to this one, so a batch interferes the
+        # way the same events submitted one at a time would
+        received, touched = interfere(log, log.position(row), log.t[row], log.amplitude[row],
+                                      log.ids[row], row + 1, self.c, self.standing_waves, sketches)
+        log.confirmations[row] += received
+        for key in touched:
+            if key in self.subscriptions:
+                self._notify(key)
                 
-                # Update standing wave pattern
-                key = self._get_data_key(event['data'])
-                if key not in self.standing_waves:
-                    self.standing_waves[key] = {
-                        'amplitude': 0,
-                        'events': [],
-                        'center': [0, 0, 0]
-                    }
-                
-                self.standing_waves[key]['amplitude'] += abs(math.cos(phase_diff))
-                self.standing_waves[key]['events'].append(event['id'])
-    
     def _calculate_phase_difference(self, event1, event2) -> float:
         """Calculate phase difference between two events"""
         distance = self._distance(event1['position'], event2['position'])
@@ -106,93 +821,320 @@ class SpacetimeConsensus:
         """Get a key representing the data content"""
         return str(data)[:50]  # Simple truncation
     
+    def is_causal(self, a: str, b: str) -> bool:
+        """Whether event b came after event a and lies inside its light cone"""
+        row, other = self.log.find(a), self.log.find(b)
+        return row is not None and other is not None and self.causal.connected(row, other)
+    
+    def future_of(self, event_id: str) -> List[str]:
+        """Ids of the later events inside an event's light cone, in submission order"""
+        row = self.log.find(event_id)
+        return [] if row is None else [self.log.id(r) for r in self.causal.future(row)]
+    
     def get_consensus(self, data_key: str) -> Optional[Dict]:
         """Get consensus state for a piece of data"""
-        if data_key not in self.standing_waves:
+        # The same dict comes back until the key's standing wave changes;
+        # treat it as read-only
+        wave = self.standing_waves.get(data_key)
+        if wave is None:
             return None
-            
-        wave = self.standing_waves[data_key]
+        answer = self.answers.get(data_key)
+        if answer and answer[0] is wave and answer[1] == wave.version:
+            return answer[2]
         
-        # Consensus achieved if standing wave amplitude exceeds threshold
-        if wave['amplitude'] > 3.0:  # Threshold
+        state = self._consensus_state(wave)
+        self.answers[data_key] = (wave, wave.version, state)
+        return state
+    
+    def _consensus_state(self, wave):
+        # Consensus achieved if standing wave amplitude exceeds threshold,
+        # as of the latest event that touched this key
+        if wave.amplitude > CONSENSUS_THRESHOLD:
             return {
                 'confirmed': True,
-                'confidence': min(wave['amplitude'] / 10.0, 1.0),
-                'validators': len(wave['events']),
-                'center_of_mass': wave['center']
+                'confidence': min(wave.amplitude / 10.0, 1.0),
+                'validators': wave.validators(),
+                'center_of_mass': wave.center()
             }
         
         return {
             'confirmed': False,
-            'confidence': wave['amplitude'] / 10.0,
-            'validators': len(wave['events'])
+            'confidence': wave.amplitude / 10.0,
+            'validators': wave.validators()
         }
     
-    def visualize_consensus_field(self, resolution: int = 20) -> List[List[float]]:
+    def subscribe(self, data_key: str, callback, delta: float = SUBSCRIPTION_DELTA) -> Subscription:
+        """Call callback(state) whenever data_key's confirmation flips or its confidence moves by more than delta"""
+        subscription = Subscription(self, data_key, callback, delta)
+        self.subscriptions.setdefault(data_key, []).append(subscription)
+        return subscription
+    
+    async def watch(self, data_key: str, delta: float = SUBSCRIPTION_DELTA):
+        """Async iterator over the consensus states subscribe() would report"""
+        # Events may be submitted from another thread; states reach the
+        # loop through call_soon_threadsafe either way
+        loop = asyncio.get_running_loop()
+        states = asyncio.Queue()
+        subscription = self.subscribe(
+            data_key, lambda state: loop.call_soon_threadsafe(states.put_nowait, state), delta)
+        try:
+            while True:
+                yield await states.get()
+        finally:
+            subscription.cancel()
+            
+    def _notify(self, data_key):
+        state = self.get_consensus(data_key)
+        for subscription in list(self.subscriptions.get(data_key, ())):
+            subscription._update(state)
+            
+    def visualize_consensus_field(self, resolution: int = 20, center: Tuple[float, float] = (0.0, 0.0),
+                                  size: float = 20.0) -> List[List[float]]:
         """Generate a 2D slice of the consensus field for visualization"""
-        field = [[0.0 for _ in range(resolution)] for _ in range(resolution)]
-        
-        for i in range(resolution):
-            for j in range(resolution):
-                x = (i / resolution - 0.5) * 20
-                y = (j / resolution - 0.5) * 20
-                
-                # Calculate field strength at this point
-                for event in self.events:
-                    distance = math.sqrt(
-                        (x - event['position'][0])**2 + 
-                        (y - event['position'][1])**2
-                    )
-                    
-                    # Wave amplitude decreases with distance
-                    amplitude = event['amplitude'] * math.exp(-distance / 5.0)
-                    
-                    # Add wave contribution
-                    phase = 2 * math.pi * distance
-                    field[i][j] += amplitude * math.cos(phase)
-        
-        return field
+        # Wave amplitude decreases with distance as exp(-d/5); events too far
+        # away to matter are culled and unchanged tiles come from the cache
+        return self.renderer.render(resolution, center, size)
     
     def get_timeline(self, node_position: Tuple[float, float, float]) -> List[Dict]:
         """Get events visible from a specific spacetime position"""
         current_time = time.time()
+        index = self.timeline
+        index.sync()
+        distances = self._distances(node_position)
+        c = self.c
         visible_events = []
         
-        for event in self.events:
-            # Check if event is within past light cone
-            distance = self._distance(node_position, event['position'])
-            time_elapsed = current_time - event['time']
+        # Only events up to now can be in the past light cone
+        candidates = bisect.bisect_right(index.times, current_time)
+        for event_time, row in itertools.islice(zip(index.times, index.rows), candidates):
+            distance = distances[row]
+            time_elapsed = current_time - event_time
             
-            if distance <= self.c * time_elapsed:
-                visible_events.append({
-                    'id': event['id'],
-                    'data': event['data'],
-                    'confidence': event['confirmations'] / 10.0,
-                    'age': time_elapsed,
-                    'distance': distance
-                })
-        
+            if distance <= c * time_elapsed:
+                visible_events.append((time_elapsed - distance / c, row, time_elapsed, distance))
+                
         # Sort by light-distance (most recent visible events first)
-        visible_events.sort(key=lambda e: e['age'] - e['distance'] / self.c)
+        visible_events.sort()
         
-        return visible_events
+        entry = self._timeline_entry
+        return [entry(row, time_elapsed, distance) for _, row, time_elapsed, distance in visible_events]
+    
+    def iter_timeline(self, node_position: Tuple[float, float, float], limit: Optional[int] = None):
+        """Events visible from a position as a generator, most recent visible first, up to limit"""
+        return itertools.islice(self._visible_events(node_position), limit)
+    
+    def _visible_events(self, node_position):
+        """
+        Walk back in time from now, yielding each visible event as soon
+        as no older event can come before it in light-distance order
+        """
+        current_time = time.time()
+        index = self.timeline
+        index.sync()
+        if not index.times:
+            return
+        distance_to = self._distance_from(node_position)
+        
+        # An event's light-distance is never less than its age minus this
+        reach = index.reach(node_position) * (1 + 1e-12) / self.c + 1e-9
+        pending = []  # (light-distance, row, age, distance)
+        
+        for i in range(bisect.bisect_right(index.times, current_time) - 1, -1, -1):
+            time_elapsed = current_time - index.times[i]
+            while pending and pending[0][0] < time_elapsed - reach:
+                yield self._timeline_entry(*heapq.heappop(pending)[1:])
+                
+            # Check if event is within past light cone
+            row = index.rows[i]
+            distance = distance_to(row)
+            if distance <= self.c * time_elapsed:
+                heapq.heappush(pending, (time_elapsed - distance / self.c, row, time_elapsed, distance))
+                
+        while pending:
+            yield self._timeline_entry(*heapq.heappop(pending)[1:])
+            
+    def _distances(self, position):
+        """_distance from position to every logged event, in row order"""
+        log = self.log
+        if len(position) != 3:
+            return [self._distance(position, log.position(row)) for row in range(len(log))]
+        px, py, pz = position
+        sqrt = math.sqrt
+        return [sqrt(sum(((px - x)**2, (py - y)**2, (pz - z)**2))) for x, y, z in zip(log.x, log.y, log.z)]
+    
+    def _distance_from(self, position):
+        """row -> _distance(position, that event), straight from the columns"""
+        log = self.log
+        if len(position) != 3:
+            return lambda row: self._distance(position, log.position(row))
+        px, py, pz = position
+        xs, ys, zs = log.x, log.y, log.z
+        sqrt = math.sqrt
+        return lambda row: sqrt(sum(((px - xs[row])**2, (py - ys[row])**2, (pz - zs[row])**2)))
+    
+    def _timeline_entry(self, row, time_elapsed, distance):
+        log = self.log
+        return {
+            'id': format(log.ids[row], '016x'),
+            'data': log.payloads[log.payload[row]],
+            'confidence': log.confirmations[row] / 10.0,
+            'age': time_elapsed,
+            'distance': distance
+        }
     
     def merge_timelines(self, other_consensus: 'SpacetimeConsensus'):
         """Merge with another consensus instance (network partition healing)"""
-        # Add all events from other timeline
-        for event in other_consensus.events:
-            if not any(e['id'] == event['id'] for e in self.events):
-                self.events.append(event)
-        
-        # Rebuild light cones and interference patterns
-        self.light_cones = {}
-        self.standing_waves = {}
+        return self.merge_replicas([other_consensus], workers=1)
+    
+    def merge_replicas(self, replicas: List['SpacetimeConsensus'], workers: Optional[int] = None) -> int:
+        """
+        Merge any number of replicas in one go; returns the number of events afterwards.
+        Events older than their key's checkpoint are not applied, whether
+        pruned copies or never seen here; last_merge says how many.
+        workers=None checks interference in-process unless the merged events
+        times the history reach MERGE_POOL_WORK, and only then uses a pool
+        of os.cpu_count() processes; pass workers to choose either way.
+        """
+        # Apply only the events this timeline has not seen, as if they had
+        # been submitted here with zero confirmations; light cones and
+        # standing waves already cover the rest. One pass over the inputs
+        # drops what is known here or came first from another replica
+        merged = []
+        final = set()
+        for replica in replicas:
+            other = replica.log
+            for i in range(len(other)):
+                if self.checkpoints and self._finalized(other.key(i), other.t[i]):
+                    final.add(other.ids[i])
+                    continue
+                if self._is_new(other.id(i)):
+                    merged.append(self._append(dict(other.event(i), confirmations=0)))
+        self.dropped_final += len(final)
+        self.last_merge = {'merged': len(merged), 'dropped_final': len(final)}
+        if not merged:
+            return len(self.events)
+        self._update_light_cones(merged[-1])
         
-        for event in self.events:
-            self._update_light_cones(event)
-            self._check_interference(event)
+        if workers is None:
+            # Each pool worker gets its partition's whole history pickled over,
+            # which only pays off when there is a lot of interference to spread
+            large = len(merged) * len(self.log) >= MERGE_POOL_WORK
+            workers = os.cpu_count() if large else 1
+        partitions = self._partitions(workers)
+        if len(partitions) < 2:
+            sketches = {}
+            for row in merged:
+                self._check_interference(row, sketches)
+        else:
+            self._merge_partitions(merged, partitions)
         
+        self._ingested(len(merged))
         return len(self.events)
+    
+    def _partitions(self, count):
+        """Data keys dealt into up to `count` sets of about equal row counts"""
+        log = self.log
+        sizes = Counter()
+        for payload, rows in Counter(log.payload).items():
+            sizes[log.payload_keys[payload]] += rows
+        if count < 2 or len(sizes) < 2:
+            return [set(sizes)]
+        
+        # Largest first, each to the lightest partition so far
+        loads = [(0, n, set()) for n in range(min(count, len(sizes)))]
+        for key, rows in sizes.most_common():
+            load, n, keys = heapq.heappop(loads)
+            keys.add(key)
+            heapq.heappush(loads, (load + rows, n, keys))
+        return [keys for _, _, keys in sorted(loads, key=lambda load: load[1])]
+    
+    def _merge_partitions(self, merged, partitions):
+        """Interference for merged rows, one process per partition of data keys"""
+        # A row's confirmations and its key's wave only change through the
+        # partition holding that key. What a merged event receives is
+        # summed over all of them, so its total may differ from one
+        # submit_event in the last bits
+        log = self.log
+        owner = {key: n for n, keys in enumerate(partitions) for key in keys}
+        members = [array('l') for _ in partitions]
+        for row, payload in enumerate(log.payload):
+            members[owner[log.payload_keys[payload]]].append(row)
+        
+        arrivals = [(row, log.position(row), log.t[row], log.amplitude[row], log.ids[row]) for row in merged]
+        tasks = []
+        for keys, rows in zip(partitions, members):
+            part = log.take(rows)
+            part.payloads = []  # Workers only need the keys
+            waves = {key: self.standing_waves[key] for key in keys if key in self.standing_waves}
+            tasks.append((rows, part, arrivals, waves, self.c))
+            
+        with multiprocessing.Pool(len(tasks)) as pool:
+            results = pool.map(_merge_partition, tasks)
+            
+        received = [0.0] * len(merged)
+        for rows, (confirmations, amounts, waves) in zip(members, results):
+            for row, value in zip(rows, confirmations):
+                log.confirmations[row] = value
+            for n, amount in enumerate(amounts):
+                received[n] += amount
+            self.standing_waves.update(waves)
+        for row, amount in zip(merged, received):
+            log.confirmations[row] += amount
+            
+        for key in list(self.subscriptions):
+            if key in self.standing_waves:
+                self._notify(key)
+                
+    def _ingested(self, count):
+        """Count newly applied events and prune once PRUNE_EVERY have come in"""
+        self.since_prune += count
+        if self.finality is not None and self.since_prune >= PRUNE_EVERY:
+            self.prune()
+            
+    def _finalized(self, data_key, event_time):
+        """Whether an event falls inside its key's checkpoint, final before it arrived"""
+        checkpoint = self.checkpoints.get(data_key)
+        return checkpoint is not None and event_time <= checkpoint['until']
+    
+    def prune(self, now: Optional[float] = None) -> int:
+        """Fold final events into checkpoints and drop them from the log; returns how many went"""
+        # Final: older than the finality horizon, measured back from the
+        # newest event, with a confirmed key. Their confirmations are
+        # already in the standing waves; later events stop interfering
+        # with them and rebroadcasts of them are dropped
+        self.since_prune = 0
+        log = self.log
+        if self.finality is None or not len(log):
+            return 0
+        horizon = (max(log.t) if now is None else now) - self.finality
+        final = {key for key, wave in self.standing_waves.items() if self.get_consensus(key)['confirmed']}
+        if not final:
+            return 0
+        
+        keep = array('l')
+        keys = log.payload_keys
+        for row, (t, payload) in enumerate(zip(log.t, log.payload)):
+            key = keys[payload]
+            if t >= horizon or key not in final:
+                keep.append(row)
+                continue
+            checkpoint = self.checkpoints.get(key)
+            if checkpoint is None:
+                checkpoint = self.checkpoints[key] = {
+                    'events': 0,
+                    'confirmations': 0.0,
+                    'until': -math.inf,  # Event time of the newest pruned event
+                    'digest': 0
+                }
+            checkpoint['events'] += 1
+            checkpoint['confirmations'] += log.confirmations[row]
+            checkpoint['until'] = max(checkpoint['until'], t)
+            checkpoint['digest'] ^= log.ids[row]  # XOR of the pruned ids, in any order
+            
+        pruned = len(log) - len(keep)
+        if pruned:
+            self._attach(log.take(keep))
+        return pruned
 
 
 # Example usage showing consensus emergence
@@ -4,14 +4,19 @@ DMCT: Decentralized Mutual Cascading Trust
 "Like ripples in spacetime, trust propagates through consciousness itself."
 """
 
+import heapq
+import itertools
 import json
 import math
+import queue
 import random
 import socket
 import struct
+import sys
 import threading
 import time
-from collections import defaultdict
+from array import array
+from collections import OrderedDict, defaultdict, deque
 from hashlib import sha256
 
 # Universal Constants
@@ -21,11 +26,37 @@ NEIGHBOR_RADIUS = 6
 WAVE_RESOLUTION = 0.1
 INTERFERENCE_THRESHOLD = 3.0
 LIGHT_SPEED = 299792458.0
+WAVE_EPSILON = 1e-6
+WAVE_SLOT_WIDTH = 3600.0
+SEEN_CAPACITY = 65536
+CASCADE_HOPS = 8
+SNAPSHOT_HISTORY = 100000
+PROPAGATION_WORKERS = 8
+PROPAGATION_QUEUE = 65536
+
+class SystemClock:
+    def now(self):
+        return time.time()
+
+class SimulatedClock:
+    """Time that only moves when a Simulation advances it"""
+    
+    def __init__(self, start=0.0):
+        self.t = start
+    
+    def now(self):
+        return self.t
+
+# Everything in the trust core reads time and randomness through these,
+# so a Simulation can swap in its own clock and a seeded generator
+clock = SystemClock()
+rng = random.Random()
+wave_sequence = itertools.count()  # Numbers every wave made in this process
 
 class SpacetimePoint:
     def __init__(self, x=0, y=0, z=0, t=None):
         self.x, self.y, self.z = x, y, z
-        self.t = t or time.time()
+        self.t = clock.now() if t is None else t
     
     def distance(self, other):
         return math.sqrt((self.x-other.x)**2 + (self.y-other.y)**2 + (self.z-other.z)**2)
@@ -36,13 +67,20 @@ class SpacetimePoint:
         return math.sqrt(time_diff**2 - (space/LIGHT_SPEED)**2) if time_diff > space/LIGHT_SPEED else 0
 
 class TrustWave:
-    def __init__(self, origin, amplitude=1.0, frequency=1.0, phase=0.0, data=None):
+    def __init__(self, origin, amplitude=1.0, frequency=1.0, phase=0.0, data=None, wave_id=None):
         self.origin = origin
         self.amplitude = amplitude
         self.frequency = frequency
         self.phase = phase
         self.data = data or {}
-        self.id = sha256(f"{origin.x}{origin.y}{origin.z}{origin.t}".encode()).hexdigest()[:8]
+        # 64 bits over everything that tells two waves apart, plus a sequence
+        # number so one node emitting twice in the same instant still differs.
+        # A wave from a peer keeps the id it was sent with.
+        if wave_id is None:
+            content = (f"{origin.x}|{origin.y}|{origin.z}|{origin.t}|{amplitude}|"
+                       f"{frequency}|{phase}|{next(wave_sequence)}")
+            wave_id = sha256(content.encode()).hexdigest()[:16]
+        self.id = wave_id
     
     def field_at(self, point):
         r = self.origin.distance(point)
@@ -55,122 +93,803 @@ class TrustWave:
         wave = math.cos(2*math.pi*self.frequency*(t_diff - r/TRUST_SPEED) + self.phase)
         
         return self.amplitude * decay * wave
+    
+    def phasor(self, epoch=0.0):
+        """
+        Complex amplitude relative to epoch. For a receiver at distance r the
+        field is Re[phasor * e^(i*2*pi*f*(T - epoch - r/c))] times the decay.
+        """
+        theta = self.phase - 2*math.pi*self.frequency*(self.origin.t - epoch)
+        return self.amplitude * complex(math.cos(theta), math.sin(theta))
+
+class _Phasor:
+    """
+    Running sum of every wave from one origin at one frequency, as seen
+    from one receiver. The distance is fixed, so the waves only differ in
+    emission time, amplitude and phase and collapse into a single complex
+    number. Decay is applied lazily when the sum is advanced.
+    """
+    
+    def __init__(self, origin, frequency, receiver):
+        self.frequency = frequency
+        self.r = math.dist(origin, receiver)
+        self.delay = self.r / TRUST_SPEED
+        self.epoch = None
+        self.tau = None  # time the sum was last decayed to
+        self.total = 0j
+        self.pending = []  # (t, seq, wave) not yet arrived at the receiver
+    
+    def add(self, seq, wave):
+        if self.epoch is None:
+            self.epoch = wave.origin.t
+        heapq.heappush(self.pending, (wave.origin.t, seq, wave))
+    
+    def advance(self, now):
+        """Fold in every wave that has reached the receiver by now"""
+        pending = self.pending
+        while pending and pending[0][0] + self.delay <= now:
+            t, _, wave = heapq.heappop(pending)
+            if self.tau is None:
+                self.tau = t
+            elif t > self.tau:
+                self.total *= math.exp(-(t - self.tau) / DECAY_TIME)
+                self.tau = t
+            self.total += wave.phasor(self.epoch) * math.exp(-(self.tau - t) / DECAY_TIME)
+    
+    def field_at(self, now):
+        self.advance(now)
+        if self.tau is None:
+            return 0.0
+        theta = 2*math.pi*self.frequency*(now - self.epoch - self.delay)
+        carrier = complex(math.cos(theta), math.sin(theta))
+        decay = math.exp(-self.r/NEIGHBOR_RADIUS - (now - self.tau)/DECAY_TIME)
+        return decay * (self.total * carrier).real
+
+class _PhasorField:
+    """One receiver's view of a WaveStore: a _Phasor per (origin, frequency)"""
+    
+    def __init__(self, receiver):
+        self.receiver = receiver
+        self.groups = {}
+        self.since = -math.inf  # earliest time this view can answer for
+    
+    def add(self, seq, wave):
+        origin = wave.origin
+        key = (origin.x, origin.y, origin.z, wave.frequency)
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = _Phasor(key[:3], wave.frequency, self.receiver)
+        group.add(seq, wave)
+    
+    def field_at(self, now):
+        return sum(group.field_at(now) for group in self.groups.values())
+
+class _WaveBucket:
+    """Waves sharing one expiry slot, stored as flat columns"""
+    
+    def __init__(self):
+        self.seqs = []
+        self.bytes = 0
+        for column in WaveStore.COLUMNS:
+            setattr(self, column, array('d'))
+    
+    def append(self, seq, wave, values):
+        """File a wave whose column values are already floats, so no append can fail partway"""
+        x, y, z, t, amplitude, frequency, phase = values
+        self.seqs.append(seq)
+        self.x.append(x)
+        self.y.append(y)
+        self.z.append(z)
+        self.t.append(t)
+        self.amplitude.append(amplitude)
+        self.frequency.append(frequency)
+        self.phase.append(phase)
+        self.bytes += (len(WaveStore.COLUMNS) * 8 + sys.getsizeof(wave) +
+                       sys.getsizeof(wave.origin) + sys.getsizeof(wave.data))
+    
+    def field_at(self, px, py, pz, pt):
+        sqrt, exp, cos = math.sqrt, math.exp, math.cos
+        omega = 2 * math.pi
+        
+        total = 0.0
+        for x, y, z, t, a, f, ph in zip(self.x, self.y, self.z, self.t,
+                                         self.amplitude, self.frequency, self.phase):
+            t_diff = pt - t
+            if t_diff < 0:
+                continue
+            r = sqrt((x-px)**2 + (y-py)**2 + (z-pz)**2)
+            delay = r / TRUST_SPEED
+            if t_diff < delay:
+                continue
+            total += a * exp(-r/NEIGHBOR_RADIUS - t_diff/DECAY_TIME) * cos(omega*f*(t_diff - delay) + ph)
+        
+        return total
+
+class WaveStore:
+    """
+    Columnar wave storage on a timing wheel.
+    A wave can never contribute more than |amplitude| * exp(-age/DECAY_TIME),
+    so it is filed under the slot in which that bound drops below epsilon,
+    and whole slots are dropped once their time has passed. epsilon=0
+    keeps every wave forever.
+    """
+    
+    COLUMNS = ('x', 'y', 'z', 't', 'amplitude', 'frequency', 'phase')
+    
+    def __init__(self, waves=(), epsilon=WAVE_EPSILON, slot_width=WAVE_SLOT_WIDTH):
+        self.epsilon = epsilon
+        self.slot_width = slot_width
+        self.buckets = {}
+        self.slots = []  # heap of bucket slots, earliest expiry first
+        self.order = {}  # seq -> wave, in arrival order
+        self.seq = 0
+        self.expired = 0
+        self.reclaimed_bytes = 0
+        self.skipped_evaluations = 0
+        self.expire_seconds = 0.0
+        self.phasors = {}  # receiver (x, y, z) -> _PhasorField
+        self.lock = threading.RLock()
+        for wave in waves:
+            self.append(wave)
+    
+    def expires_at(self, wave):
+        amplitude = abs(wave.amplitude)
+        if not self.epsilon:
+            return math.inf
+        if amplitude <= self.epsilon:
+            return wave.origin.t
+        return wave.origin.t + DECAY_TIME * math.log(amplitude / self.epsilon)
+    
+    def append(self, wave):
+        # A bad field raises here, before anything is recorded; columns of
+        # different lengths would pair every later wave with the wrong values
+        origin = wave.origin
+        values = (float(origin.x), float(origin.y), float(origin.z), float(origin.t),
+                  float(wave.amplitude), float(wave.frequency), float(wave.phase))
+        self.expire()
+        expiry = self.expires_at(wave)
+        slot = math.floor(expiry / self.slot_width) if expiry < math.inf else math.inf
+        with self.lock:
+            bucket = self.buckets.get(slot)
+            if bucket is None:
+                bucket = self.buckets[slot] = _WaveBucket()
+                heapq.heappush(self.slots, slot)
+            self.seq += 1
+            self.order[self.seq] = wave
+            bucket.append(self.seq, wave, values)
+            for view in self.phasors.values():
+                view.add(self.seq, wave)
+    
+    def expire(self, now=None):
+        """Drop every slot whose waves are all below epsilon by now"""
+        now = clock.now() if now is None else now
+        if not self.slots or (self.slots[0] + 1) * self.slot_width > now:
+            return 0
+        
+        start = time.perf_counter()
+        dropped = 0
+        with self.lock:
+            while self.slots and (self.slots[0] + 1) * self.slot_width <= now:
+                bucket = self.buckets.pop(heapq.heappop(self.slots))
+                for seq in bucket.seqs:
+                    del self.order[seq]
+                dropped += len(bucket.seqs)
+                self.reclaimed_bytes += bucket.bytes
+            self.expired += dropped
+            self.expire_seconds += time.perf_counter() - start
+        return dropped
+    
+    def stats(self):
+        return {
+            'live': len(self.order),
+            'slots': len(self.buckets),
+            'expired': self.expired,
+            'reclaimed_bytes': self.reclaimed_bytes,
+            'skipped_evaluations': self.skipped_evaluations,
+            'expire_seconds': self.expire_seconds
+        }
+    
+    def __len__(self):
+        return len(self.order)
+    
+    def __iter__(self):
+        return iter(list(self.order.values()))
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice) and index.start is not None and index.start < 0 \
+                and index.stop is None and index.step is None:
+            # Cheap tail, e.g. waves[-10:]
+            tail = list(itertools.islice(reversed(self.order.values()), -index.start))
+            return tail[::-1]
+        return list(self.order.values())[index]
+    
+    def field_at(self, point):
+        """Sum of TrustWave.field_at over every live wave"""
+        self.expire()
+        self.skipped_evaluations += self.expired
+        px, py, pz, pt = point.x, point.y, point.z, point.t
+        return sum(bucket.field_at(px, py, pz, pt) for bucket in list(self.buckets.values()))
+    
+    def phasor_field_at(self, point):
+        """
+        field_at in O(distinct origins): keeps one running phasor per
+        (origin, frequency) for each receiver position it is asked about.
+        """
+        receiver = (point.x, point.y, point.z)
+        with self.lock:
+            view = self.phasors.get(receiver)
+            if view is None:
+                view = self.phasors[receiver] = _PhasorField(receiver)
+                for seq, wave in self.order.items():
+                    view.add(seq, wave)
+                view.since = point.t
+            if point.t < view.since:
+                # Running sums only move forward in time
+                return self.field_at(point)
+            view.since = point.t
+            return view.field_at(point.t)
+
+class PropagationExecutor:
+    """
+    Bounded scheduler for wave deliveries.
+    A fixed pool of workers drains one queue; inline mode runs every
+    delivery on the emitting thread, one at a time, for simulation.
+    """
+    
+    def __init__(self, workers=PROPAGATION_WORKERS, max_queue=PROPAGATION_QUEUE, inline=False):
+        self.workers = workers
+        self.inline = inline
+        self.tasks = deque() if inline else queue.Queue(max_queue)
+        self.threads = []
+        self.draining = False
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.overflowed = 0
+        self.max_depth = 0
+    
+    def submit(self, fn, *args, delay=0.0):
+        # Real time: the field itself accounts for travel delay
+        with self.lock:
+            self.submitted += 1
+        
+        if self.inline:
+            self.tasks.append((fn, args))
+            self.max_depth = max(self.max_depth, len(self.tasks))
+            if not self.draining:
+                self._drain()
+            return
+        
+        if not self.threads:
+            self._start()
+        try:
+            self.tasks.put_nowait((fn, args))
+        except queue.Full:
+            # Back-pressure: the emitter delivers this one itself
+            with self.lock:
+                self.overflowed += 1
+            self._run(fn, args)
+            return
+        self.max_depth = max(self.max_depth, self.tasks.qsize())
+    
+    def _drain(self):
+        self.draining = True
+        try:
+            while self.tasks:
+                fn, args = self.tasks.popleft()
+                self._run(fn, args)
+        finally:
+            self.draining = False
+    
+    def _start(self):
+        with self.lock:
+            if self.threads:
+                return
+            for _ in range(self.workers):
+                thread = threading.Thread(target=self._work, daemon=True)
+                thread.start()
+                self.threads.append(thread)
+    
+    def _work(self):
+        while True:
+            fn, args = self.tasks.get()
+            try:
+                self._run(fn, args)
+            finally:
+                self.tasks.task_done()
+    
+    def _run(self, fn, args):
+        try:
+            fn(*args)
+        except Exception:
+            # The worker lives on, but the failure is counted and goes to the
+            # same hook that a thread per delivery would have reported it to
+            with self.lock:
+                self.failed += 1
+            threading.excepthook(threading.ExceptHookArgs((*sys.exc_info(), threading.current_thread())))
+        finally:
+            with self.lock:
+                self.completed += 1
+    
+    def join(self):
+        """Block until every submitted delivery has run"""
+        if self.inline:
+            if not self.draining:
+                self._drain()
+        elif self.threads:
+            self.tasks.join()
+    
+    def stats(self):
+        elapsed = max(time.time() - self.started, 1e-9)
+        return {
+            'mode': 'inline' if self.inline else 'pool',
+            'workers': 0 if self.inline else self.workers,
+            'queue_depth': len(self.tasks) if self.inline else self.tasks.qsize(),
+            'max_queue_depth': self.max_depth,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'overflowed': self.overflowed,
+            'throughput': self.completed / elapsed
+        }
+
+_default_executor = None
+
+def default_executor():
+    """Process-wide propagation pool shared by nodes without their own"""
+    global _default_executor
+    if _default_executor is None:
+        _default_executor = PropagationExecutor()
+    return _default_executor
+
+class SpatialGrid:
+    """Uniform grid over SpacetimePoint positions for radius and k-nearest queries"""
+    
+    def __init__(self, cell_size=NEIGHBOR_RADIUS * 2):
+        self.cell_size = float(cell_size)
+        self.cells = defaultdict(list)
+        self.count = 0
+    
+    def _cell(self, point):
+        size = self.cell_size
+        return (math.floor(point.x / size), math.floor(point.y / size), math.floor(point.z / size))
+    
+    def insert(self, item, point):
+        self.cells[self._cell(point)].append(((point.x, point.y, point.z), item))
+        self.count += 1
+    
+    def remove(self, item, point):
+        key = self._cell(point)
+        bucket = self.cells.get(key, [])
+        for i, (_, other) in enumerate(bucket):
+            if other is item:
+                del bucket[i]
+                self.count -= 1
+                break
+        if not bucket:
+            self.cells.pop(key, None)
+    
+    def _shell(self, center, ring):
+        """Cells on the surface of the cube `ring` cells out from center"""
+        cx, cy, cz = center
+        for i in range(cx - ring, cx + ring + 1):
+            for j in range(cy - ring, cy + ring + 1):
+                edge = ring == abs(i - cx) or ring == abs(j - cy)
+                for k in (range(cz - ring, cz + ring + 1) if edge else (cz - ring, cz + ring)):
+                    bucket = self.cells.get((i, j, k))
+                    if bucket:
+                        yield bucket
+    
+    def within(self, point, radius):
+        """Items at distance <= radius from point"""
+        size, cells, dist = self.cell_size, self.cells, math.dist
+        origin = (point.x, point.y, point.z)
+        lo = [math.floor((c - radius) / size) for c in origin]
+        hi = [math.floor((c + radius) / size) + 1 for c in origin]
+        
+        found = []
+        for i in range(lo[0], hi[0]):
+            for j in range(lo[1], hi[1]):
+                for k in range(lo[2], hi[2]):
+                    bucket = cells.get((i, j, k))
+                    if bucket:
+                        found.extend(item for position, item in bucket
+                                     if dist(origin, position) <= radius)
+        return found
+    
+    def nearest(self, point, k=1):
+        """The k items closest to point, nearest first"""
+        if k <= 0 or not self.count:
+            return []
+        center = self._cell(point)
+        origin = (point.x, point.y, point.z)
+        heap = []  # (-distance, tiebreak, item): the k best so far
+        seen = 0
+        ring = 0
+        while True:
+            for bucket in self._shell(center, ring):
+                for position, item in bucket:
+                    seen += 1
+                    d = math.dist(origin, position)
+                    if len(heap) < k:
+                        heapq.heappush(heap, (-d, id(item), item))
+                    elif d < -heap[0][0]:
+                        heapq.heapreplace(heap, (-d, id(item), item))
+            # Every cell beyond this ring is at least ring * cell_size away
+            if seen == self.count or (len(heap) == k and -heap[0][0] <= ring * self.cell_size):
+                break
+            ring += 1
+        return [item for _, _, item in sorted(heap, reverse=True)]
+    
+    def __len__(self):
+        return self.count
+
+class TrustField(defaultdict):
+    """A node's trust field that keeps its own sum up to date"""
+    
+    def __init__(self, listener=None):
+        super().__init__(float)
+        self.total = 0.0
+        self.listener = listener
+    
+    def _shift(self, delta):
+        if delta:
+            self.total += delta
+            if self.listener:
+                self.listener(delta)
+    
+    def __setitem__(self, key, value):
+        self._shift(value - self.get(key, 0.0))
+        super().__setitem__(key, value)
+    
+    def __delitem__(self, key):
+        self._shift(-self[key])
+        super().__delitem__(key)
+    
+    def pop(self, key, *default):
+        if key in self:
+            value = self[key]
+            del self[key]
+            return value
+        return super().pop(key, *default)
+    
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+    
+    def clear(self):
+        self._shift(-self.total)
+        super().clear()
+        self.total = 0.0
 
 class Node:
-    def __init__(self, position=None, identity=None):
+    def __init__(self, position=None, identity=None, executor=None, aggregate=False):
         self.position = position or SpacetimePoint(
-            random.uniform(-10, 10),
-            random.uniform(-10, 10),
-            random.uniform(-10, 10)
+            rng.uniform(-10, 10),
+            rng.uniform(-10, 10),
+            rng.uniform(-10, 10)
         )
-        self.identity = identity or random.random()
-        self.waves = []
+        self.identity = identity or rng.random()
+        self.waves = WaveStore()
         self.neighbors = []
-        self.trust_field = defaultdict(float)
+        self.neighbor_set = set()
+        self.trust_field = TrustField(self._field_changed)
         self.running = True
+        self.executor = executor or default_executor()
+        self.index = None
+        self.network = None
+        self.aggregate = aggregate
+        self.seen = OrderedDict()  # wave ids already taken in, oldest first
+        self.cascaded = OrderedDict()  # cascade roots already re-emitted
+        self.counters = {'received': 0, 'duplicates_dropped': 0,
+                         'cascades': 0, 'cascades_suppressed': 0}
+        self.guard = threading.Lock()
         
     def emit(self, amplitude=1.0, data=None):
         wave = TrustWave(
             SpacetimePoint(self.position.x, self.position.y, self.position.z),
             amplitude=amplitude,
             frequency=self.identity,
-            phase=random.random() * 2 * math.pi,
+            phase=rng.random() * 2 * math.pi,
             data=data
         )
+        self._remember(self.seen, wave.id)
+        self._remember(self.cascaded, wave.data.get('cascade_root', wave.id))
         self.waves.append(wave)
+        if self.network:
+            self.network._record(self, wave)
         self._propagate(wave)
         return wave
     
     def observe(self, radius=NEIGHBOR_RADIUS):
         field = {}
-        current_time = time.time()
+        current_time = clock.now()
         
-        for neighbor in self.neighbors:
-            if self.position.distance(neighbor.position) <= radius:
-                field[neighbor.identity] = self._calculate_field(neighbor, current_time)
+        if self.index is not None:
+            nearby = [n for n in self.index.within(self.position, radius) if n in self.neighbor_set]
+        else:
+            nearby = [n for n in self.neighbors if self.position.distance(n.position) <= radius]
+        
+        for neighbor in nearby:
+            field[neighbor.identity] = self._calculate_field(neighbor, current_time)
         
         return field
     
     def _calculate_field(self, source, t):
-        total = 0.0
         point = SpacetimePoint(self.position.x, self.position.y, self.position.z, t)
-        
-        for wave in source.waves:
-            total += wave.field_at(point)
-        
-        return total
+        if self.aggregate:
+            return source.waves.phasor_field_at(point)
+        return source.waves.field_at(point)
     
     def _propagate(self, wave):
         for neighbor in self.neighbors:
             if neighbor != self:
-                threading.Thread(target=neighbor._receive_wave, args=(wave,)).start()
+                delay = self.position.distance(neighbor.position) / TRUST_SPEED
+                self.executor.submit(neighbor._receive_wave, wave, delay=delay)
     
     def _receive_wave(self, wave):
+        if not self._remember(self.seen, wave.id):
+            self._count('duplicates_dropped')
+            return
+        self._count('received')
         self.waves.append(wave)
+        if self.network:
+            self.network._record(self, wave)
         
-        current_field = self._calculate_field(self, time.time())
+        current_field = self._calculate_field(self, clock.now())
         if abs(current_field) > INTERFERENCE_THRESHOLD * self._local_average():
+            # Each node re-emits a cascade at most once, and only so many hops out
+            root = wave.data.get('cascade_root', wave.id)
+            if wave.data.get('hops', 0) >= CASCADE_HOPS or not self._remember(self.cascaded, root):
+                self._count('cascades_suppressed')
+                return
+            self._count('cascades')
             self._cascade(wave)
     
     def _cascade(self, original_wave):
         new_wave = self.emit(
             amplitude=original_wave.amplitude * 0.8,
-            data={**original_wave.data, 'cascaded_from': original_wave.id}
+            data={**original_wave.data, 'cascaded_from': original_wave.id,
+                  'cascade_root': original_wave.data.get('cascade_root', original_wave.id),
+                  'hops': original_wave.data.get('hops', 0) + 1}
         )
     
+    def _remember(self, table, key):
+        """Add key to a bounded recency table; False if it was already there"""
+        with self.guard:
+            if key in table:
+                table.move_to_end(key)
+                return False
+            table[key] = True
+            if len(table) > SEEN_CAPACITY:
+                table.popitem(last=False)
+            return True
+    
+    def _count(self, counter):
+        with self.guard:
+            self.counters[counter] += 1
+    
+    def _field_changed(self, delta):
+        if self.network:
+            self.network._record(self, field_delta=delta)
+    
     def _local_average(self):
         if not self.trust_field:
             return 1.0
         return sum(abs(v) for v in self.trust_field.values()) / len(self.trust_field)
     
     def connect(self, other):
-        if other not in self.neighbors:
+        if other not in self.neighbor_set:
             self.neighbors.append(other)
+            self.neighbor_set.add(other)
             other.neighbors.append(self)
+            other.neighbor_set.add(self)
 
 class Network:
-    def __init__(self):
+    def __init__(self, executor=None):
         self.nodes = []
-        self.epoch = time.time()
+        self.epoch = clock.now()
+        self.executor = executor
+        self.index = SpatialGrid(NEIGHBOR_RADIUS * 2)
+        
+        # Change tracking for snapshot() and totals()
+        self.version = 0
+        self.changed = OrderedDict()  # node -> version of its last change, oldest first
+        self.wave_log = deque(maxlen=SNAPSHOT_HISTORY)  # (version, wave)
+        self.waves_seen = 0
+        self.field_total = 0.0
+        self.lock = threading.Lock()
         
     def add_node(self, node):
+        if self.executor:
+            node.executor = self.executor
         self.nodes.append(node)
         
         # Connect to nearby nodes
-        for other in self.nodes:
+        for other in self.index.within(node.position, NEIGHBOR_RADIUS * 2):
             if other != node and node.position.distance(other.position) < NEIGHBOR_RADIUS * 2:
                 node.connect(other)
         
+        self.index.insert(node, node.position)
+        node.index = self.index
+        node.network = self
+        self._record(node, field_delta=node.trust_field.total)
+        for other in node.neighbors:
+            if other.network is self:
+                self._record(other)
+        
         # Announcement ripple
         node.emit(amplitude=2.0, data={'type': 'join', 'epoch': self.epoch})
+    
+    def _record(self, node, wave=None, field_delta=0.0):
+        with self.lock:
+            self.version += 1
+            self.changed[node] = self.version
+            self.changed.move_to_end(node)
+            self.field_total += field_delta
+            if wave is not None:
+                self.waves_seen += 1
+                self.wave_log.append((self.version, wave))
+    
+    def _node_state(self, node):
+        return {
+            'id': node.identity,
+            'position': [node.position.x, node.position.y, node.position.z],
+            'field': node.trust_field.total,
+            'neighbors': len(node.neighbors)
+        }
+    
+    def _wave_state(self, wave, now):
+        return {
+            'origin': [wave.origin.x, wave.origin.y, wave.origin.z],
+            'amplitude': wave.amplitude,
+            'age': now - wave.origin.t
+        }
         
     def visualize(self):
+        now = clock.now()
         state = {
             'nodes': [],
             'waves': [],
-            'time': time.time() - self.epoch
+            'time': now - self.epoch
         }
         
         for node in self.nodes:
-            state['nodes'].append({
-                'id': node.identity,
-                'position': [node.position.x, node.position.y, node.position.z],
-                'field': sum(node.trust_field.values()),
-                'neighbors': len(node.neighbors)
-            })
+            state['nodes'].append(self._node_state(node))
             
             for wave in node.waves[-10:]:  # Last 10 waves
-                state['waves'].append({
-                    'origin': [wave.origin.x, wave.origin.y, wave.origin.z],
-                    'amplitude': wave.amplitude,
-                    'age': time.time() - wave.origin.t
-                })
+                state['waves'].append(self._wave_state(wave, now))
         
         return state
+    
+    def snapshot(self, since=None):
+        """
+        What changed after version `since`: the nodes touched and the waves
+        taken in since then. Pass back the returned version next time. A
+        full visualize() state comes back, marked 'full', when `since` is
+        None or older than the wave history kept.
+        """
+        with self.lock:
+            version = self.version
+            oldest = self.wave_log[0][0] if self.wave_log else version + 1
+            truncated = len(self.wave_log) == self.wave_log.maxlen and since is not None and since < oldest - 1
+            if since is None or truncated:
+                full = True
+            else:
+                full = False
+                nodes = []
+                for node in reversed(self.changed):
+                    if self.changed[node] <= since:
+                        break
+                    nodes.append(node)
+                waves = []
+                for v, wave in reversed(self.wave_log):
+                    if v <= since:
+                        break
+                    waves.append(wave)
+        
+        if full:
+            return {**self.visualize(), 'version': version, 'full': True}
+        
+        now = clock.now()
+        return {
+            'nodes': [self._node_state(node) for node in reversed(nodes)],
+            'waves': [self._wave_state(wave, now) for wave in reversed(waves)],
+            'time': now - self.epoch,
+            'version': version,
+            'full': False
+        }
+    
+    def totals(self):
+        """Aggregate state in O(1): no per-node work at all"""
+        return {
+            'nodes': len(self.nodes),
+            'waves_seen': self.waves_seen,
+            'field': self.field_total,
+            'time': clock.now() - self.epoch,
+            'version': self.version
+        }
 
-def genesis():
+class Simulation:
+    """
+    Discrete-event engine on a simulated clock.
+    Emissions, deliveries and ticks wait in one priority queue and the
+    clock jumps from event to event, so an hour of network activity takes
+    only as long as its events do. A wave is delivered when it actually
+    reaches its receiver. Same seed and start, same run.
+    """
+    
+    def __init__(self, seed=None, start=0.0):
+        self.seed = seed
+        self.clock = SimulatedClock(start)
+        self.events = []  # heap of (time, seq, kind, fn, args)
+        self.seq = 0
+        self.processed = defaultdict(int)
+        self.state = None  # The run's random stream between uses
+        self.sequence = itertools.count()
+        self.saved = []
+    
+    def schedule(self, delay, kind, fn, *args):
+        heapq.heappush(self.events, (self.clock.now() + delay, self.seq, kind, fn, args))
+        self.seq += 1
+    
+    def submit(self, fn, *args, delay=0.0):
+        """Executor protocol: a wave delivery becomes a receive event"""
+        self.schedule(delay, 'receive', fn, *args)
+    
+    def run(self, until=math.inf, realtime=False):
+        """Process events up to the simulated time `until`"""
+        wall_start, sim_start = time.time(), self.clock.now()
+        
+        while self.events and self.events[0][0] <= until:
+            t, _, kind, fn, args = heapq.heappop(self.events)
+            if realtime:
+                time.sleep(max(0.0, (t - sim_start) - (time.time() - wall_start)))
+            self.clock.t = max(self.clock.t, t)
+            fn(*args)
+            self.processed[kind] += 1
+        
+        if until < math.inf:
+            self.clock.t = max(self.clock.t, until)
+        return self.clock.now()
+    
+    def join(self):
+        self.run()
+    
+    def stats(self):
+        return {
+            'mode': 'simulated',
+            'time': self.clock.now(),
+            'queue_depth': len(self.events),
+            'processed': dict(self.processed)
+        }
+    
+    def __enter__(self):
+        """Route the trust core's clock, randomness, wave ids and deliveries through this run"""
+        global clock, _default_executor, wave_sequence
+        self.saved.append((clock, _default_executor, wave_sequence, rng.getstate()))
+        clock, _default_executor, wave_sequence = self.clock, self, self.sequence
+        if len(self.saved) == 1:
+            # Seeded on first use, then picked up where the last use left it
+            if self.state is None:
+                rng.seed(self.seed)
+            else:
+                rng.setstate(self.state)
+        return self
+    
+    def __exit__(self, *exc):
+        global clock, _default_executor, wave_sequence
+        clock, _default_executor, wave_sequence, state = self.saved.pop()
+        if not self.saved:
+            # The caller gets its own random stream back
+            self.state = rng.getstate()
+            rng.setstate(state)
+
+def genesis(network=None):
     """Birth of a trust universe"""
-    network = Network()
+    network = network if network is not None else Network()
     
     # Create founding nodes in a beautiful pattern
     for i in range(7):  # Seven, a perfect number
@@ -190,26 +909,58 @@ def genesis():
     
     return network
 
-def simulate(network, duration=60):
-    """Watch trust evolve"""
-    start = time.time()
+def simulate(network, duration=60, seed=None, engine=None, realtime=False):
+    """
+    Watch trust evolve.
+    Waves still on their way when the duration is up are delivered before
+    this returns, the simulated clock running on past the end as far as
+    they need.
+    """
+    if engine is None:
+        engine = Simulation(seed, start=clock.now())
     
-    while time.time() - start < duration:
-        # Random trust emissions
-        if random.random() < 0.1:
-            node = random.choice(network.nodes)
-            node.emit(amplitude=random.uniform(0.5, 2.0))
-        
-        # Occasional new nodes
-        if random.random() < 0.02:
-            network.add_node(Node())
-        
-        time.sleep(WAVE_RESOLUTION)
-        
-        # Print network state
-        state = network.visualize()
-        total_trust = sum(n['field'] for n in state['nodes'])
-        print(f"\rTime: {state['time']:.1f}s | Nodes: {len(state['nodes'])} | Trust: {total_trust:.2f}", end="")
+    # Deliveries go through the engine only while it runs; the network gets
+    # its own executors back afterwards, or later emits would never arrive
+    saved = (network.executor, {node: node.executor for node in network.nodes})
+    try:
+        with engine:
+            network.executor = engine
+            for node in network.nodes:
+                node.executor = engine
+            start = engine.clock.now()
+            
+            def tick():
+                # Random trust emissions
+                if rng.random() < 0.1:
+                    node = rng.choice(network.nodes)
+                    node.emit(amplitude=rng.uniform(0.5, 2.0))
+                
+                # Occasional new nodes
+                if rng.random() < 0.02:
+                    network.add_node(Node())
+                
+                # Print network state
+                state = network.totals()
+                print(f"\rTime: {state['time']:.1f}s | Nodes: {state['nodes']} | Trust: {state['field']:.2f}", end="")
+                
+                if engine.clock.now() + WAVE_RESOLUTION <= start + duration:
+                    engine.schedule(WAVE_RESOLUTION, 'tick', tick)
+            
+            engine.schedule(WAVE_RESOLUTION, 'tick', tick)
+            engine.run(until=start + duration, realtime=realtime)
+            
+            # Deliveries left queued here would never run once the nodes
+            # have their own executors back
+            while any(kind == 'receive' for _, _, kind, _, _ in engine.events):
+                engine.run(until=max(t for t, _, kind, _, _ in engine.events if kind == 'receive'),
+                           realtime=realtime)
+    finally:
+        network.executor, executors = saved
+        for node in network.nodes:
+            # Nodes that joined mid-run go where a node joining now would
+            node.executor = executors.get(node) or network.executor or default_executor()
+    
+    return engine
 
 if __name__ == "__main__":
     print("DMCT: Initializing trust field...")
@@ -220,6 +971,6 @@ if __name__ == "__main__":
     print("\n🌊 Trust ripples beginning...\n")
     
     try:
-        simulate(network)
+        simulate(network, realtime=True)
     except KeyboardInterrupt:
         print("\n\n💫 Trust field stabilized. Network persists in quantum foam.")
\ No newline at end of file
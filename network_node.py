@@ -3,12 +3,68 @@
 DMCT Network Node - Connect to the infinite trust network
 """
 
+import asyncio
+import concurrent.futures
+from collections import deque
 import socket
 import json
+import math
+import sys
 import threading
 import time
 import dmct
 
+HEARTBEAT_INTERVAL = 30.0  # Seconds between presence pulses
+PEER_TIMEOUT = 300.0  # Seconds of silence before a learned peer is forgotten
+WAVE_WORKERS = 1  # Threads processing received waves
+WAVE_BACKLOG = 1024  # Waves waiting for a worker before new ones are dropped
+RECEIVE_BUFFER = 4 * 1024 * 1024  # Socket buffer asked for, to ride out bursts; the OS may cap it
+
+def _wave_packet(wave):
+    """A wave as the JSON datagram peers exchange"""
+    return json.dumps({
+        'origin': {
+            'x': wave.origin.x,
+            'y': wave.origin.y,
+            'z': wave.origin.z,
+            't': wave.origin.t
+        },
+        'amplitude': wave.amplitude,
+        'frequency': wave.frequency,
+        'phase': wave.phase,
+        'data': wave.data,
+        'id': wave.id
+    }).encode()
+
+def _number(value):
+    """A finite JSON number, or TypeError / ValueError"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise TypeError(f"not a number: {value!r}")
+    if not math.isfinite(value):
+        raise ValueError(f"not finite: {value!r}")
+    return value
+
+def _parse_wave(packet):
+    """The wave in a datagram; raises ValueError, KeyError or TypeError if it is not one"""
+    wave_data = json.loads(packet.decode())
+    origin = dmct.SpacetimePoint(
+        _number(wave_data['origin']['x']),
+        _number(wave_data['origin']['y']),
+        _number(wave_data['origin']['z']),
+        _number(wave_data['origin']['t'])
+    )
+    data = wave_data.get('data', {})
+    if not isinstance(data, dict):
+        raise TypeError(f"wave data is not an object: {data!r}")
+    return dmct.TrustWave(
+        origin,
+        amplitude=_number(wave_data['amplitude']),
+        frequency=_number(wave_data['frequency']),
+        phase=_number(wave_data['phase']),
+        data=data,
+        wave_id=str(wave_data['id']) if 'id' in wave_data else None  # Sender's id, so copies dedupe
+    )
+
 class NetworkNode(dmct.Node):
     def __init__(self, port=31415, bootstrap_peers=None):
         super().__init__()
@@ -49,23 +105,9 @@ class NetworkNode(dmct.Node):
         while self.running:
             try:
                 data, addr = self.server.recvfrom(4096)
-                wave_data = json.loads(data.decode())
                 
                 # Create wave from network data
-                origin = dmct.SpacetimePoint(
-                    wave_data['origin']['x'],
-                    wave_data['origin']['y'],
-                    wave_data['origin']['z'],
-                    wave_data['origin']['t']
-                )
-                
-                wave = dmct.TrustWave(
-                    origin,
-                    amplitude=wave_data['amplitude'],
-                    frequency=wave_data['frequency'],
-                    phase=wave_data['phase'],
-                    data=wave_data.get('data', {})
-                )
+                wave = _parse_wave(data)
                 
                 # Process incoming wave
                 self._receive_wave(wave)
@@ -84,21 +126,7 @@ class NetworkNode(dmct.Node):
         wave = super().emit(amplitude, data)
         
         # Broadcast to all peers
-        wave_packet = {
-            'origin': {
-                'x': wave.origin.x,
-                'y': wave.origin.y,
-                'z': wave.origin.z,
-                't': wave.origin.t
-            },
-            'amplitude': wave.amplitude,
-            'frequency': wave.frequency,
-            'phase': wave.phase,
-            'data': wave.data,
-            'id': wave.id
-        }
-        
-        message = json.dumps(wave_packet).encode()
+        message = _wave_packet(wave)
         
         for peer in self.peers:
             try:
@@ -132,6 +160,176 @@ class NetworkNode(dmct.Node):
         
         threading.Thread(target=pulse, daemon=True).start()
 
+class _WaveProtocol(asyncio.DatagramProtocol):
+    """Hands each datagram to its AsyncNetworkNode, on the node's event loop"""
+    
+    def __init__(self, node):
+        self.node = node
+        
+    def datagram_received(self, data, addr):
+        self.node._datagram(data, addr)
+        
+    def error_received(self, exc):
+        self.node.traffic['errors'] += 1
+
+class AsyncNetworkNode(dmct.Node):
+    """
+    NetworkNode on asyncio. One event loop owns the socket, the peer table
+    and the heartbeat; datagrams are parsed and checked for duplicates on
+    the loop, and only the wave processing goes to a bounded thread pool,
+    whose workers drain a shared inbox in turn rather than taking one job
+    per wave. With `backlog` waves already waiting, new ones are dropped
+    the way a full socket buffer would drop them, so a flood can neither
+    grow the queue and its latency without limit nor stall the loop.
+    """
+    
+    def __init__(self, port=31415, bootstrap_peers=None, host='0.0.0.0',
+                 workers=WAVE_WORKERS, backlog=WAVE_BACKLOG, **kwargs):
+        super().__init__(**kwargs)
+        self.port = port
+        self.host = host
+        self.bootstrap_peers = bootstrap_peers or []
+        self.bootstrap = set()  # Resolved bootstrap addresses, never forgotten
+        self.peers = {}  # (host, port) -> loop time last heard from
+        self.backlog = backlog
+        self.inbox = deque()  # Parsed waves waiting for a worker
+        self.workers = workers
+        self.draining = 0  # Workers currently emptying the inbox
+        self.pool = concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix='dmct-wave')
+        self.loop = None
+        self.transport = None
+        self.heartbeat = None
+        self.traffic = {'packets': 0, 'malformed': 0, 'duplicates': 0, 'dropped': 0,
+                        'processed': 0, 'failed': 0, 'errors': 0}
+        
+    async def start(self):
+        """Bind the socket, find the bootstrap peers, announce ourselves and start the heartbeat"""
+        self.loop = asyncio.get_running_loop()
+        self.transport, _ = await self.loop.create_datagram_endpoint(
+            lambda: _WaveProtocol(self), local_addr=(self.host, self.port))
+        self.port = self.transport.get_extra_info('sockname')[1]
+        self.transport.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+        print(f"📡 Listening for trust ripples on port {self.port}")
+        
+        # Resolve names once here; sendto on the loop must never block on DNS
+        for peer in self.bootstrap_peers:
+            host, port = peer.rsplit(':', 1)
+            try:
+                found = await self.loop.getaddrinfo(host, int(port), family=socket.AF_INET, type=socket.SOCK_DGRAM)
+            except (OSError, ValueError):
+                continue
+            for *_, address in found[:1]:
+                self.bootstrap.add(address)
+                self.peers[address] = self.loop.time()
+                
+        self.emit(amplitude=2.0, data={'type': 'join', 'port': self.port})
+        self.heartbeat = self.loop.create_task(self._heartbeat())
+        
+    def _datagram(self, packet, addr):
+        traffic = self.traffic
+        traffic['packets'] += 1
+        if addr not in self.peers:
+            print(f"🤝 New peer connected: {addr[0]}:{addr[1]}")
+        self.peers[addr] = self.loop.time()
+        
+        try:
+            wave = _parse_wave(packet)
+        except (ValueError, KeyError, TypeError):
+            traffic['malformed'] += 1
+            return
+        # Cheap early drop; _receive_wave still checks under the node's lock
+        if wave.id in self.seen:
+            traffic['duplicates'] += 1
+            return
+        if len(self.inbox) >= self.backlog:
+            traffic['dropped'] += 1
+            return
+        
+        self.inbox.append(wave)
+        if self.draining < self.workers:
+            self._dispatch()
+            
+    def _dispatch(self):
+        self.draining += 1
+        self.loop.run_in_executor(self.pool, self._drain).add_done_callback(self._drained)
+        
+    def _drain(self):
+        """Pool worker: process waves until the inbox is empty"""
+        processed = failed = 0
+        while True:
+            try:
+                wave = self.inbox.popleft()
+            except IndexError:
+                return processed, failed
+            try:
+                self._receive_wave(wave)
+                processed += 1
+            except Exception:
+                # Counted, and reported the way PropagationExecutor reports a failed delivery
+                failed += 1
+                threading.excepthook(threading.ExceptHookArgs((*sys.exc_info(), threading.current_thread())))
+                
+    def _drained(self, future):
+        self.draining -= 1
+        if future.cancelled():
+            return
+        processed, failed = future.result()
+        self.traffic['processed'] += processed
+        self.traffic['failed'] += failed
+        # A wave may have landed after the worker found the inbox empty
+        if self.inbox and self.running and not self.draining:
+            self._dispatch()
+            
+    def emit(self, amplitude=1.0, data=None):
+        """Emit wave locally and to network"""
+        wave = super().emit(amplitude, data)
+        # Cascades emit from pool threads; the loop does all the sending
+        if self.loop is not None and self.running:
+            self.loop.call_soon_threadsafe(self._broadcast, _wave_packet(wave))
+        return wave
+    
+    def _broadcast(self, message):
+        if self.transport is None or self.transport.is_closing():
+            return
+        for peer in self.peers:
+            self.transport.sendto(message, peer)
+            
+    async def _heartbeat(self):
+        """Periodic trust pulse, forgetting learned peers that went quiet"""
+        while self.running:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            self.emit(amplitude=0.5, data={'type': 'heartbeat'})
+            quiet = self.loop.time() - PEER_TIMEOUT
+            for peer, heard in list(self.peers.items()):
+                if heard < quiet and peer not in self.bootstrap:
+                    del self.peers[peer]
+                    
+    def stats(self):
+        return {**self.traffic, 'peers': len(self.peers), 'backlog': len(self.inbox)}
+    
+    def close(self):
+        self.running = False
+        if self.heartbeat:
+            self.heartbeat.cancel()
+        if self.transport:
+            self.transport.close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        
+    async def __aenter__(self):
+        await self.start()
+        return self
+    
+    async def __aexit__(self, *exc):
+        self.close()
+
+async def serve(port=31415, bootstrap_peers=None):
+    """Run an AsyncNetworkNode until interrupted"""
+    async with AsyncNetworkNode(port, bootstrap_peers) as node:
+        print(f"🌊 DMCT node on port {node.port}, frequency {node.identity:.3f} Hz")
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            print(f"📊 {node.stats()}")
+
 def quickstart():
     """Easy mode: Connect to the infinite"""
     print("""
@@ -182,4 +380,10 @@ def quickstart():
     print("\n🌌 Thank you for trusting!\n")
 
 if __name__ == "__main__":
-    quickstart()
\ No newline at end of file
+    if '--asyncio' in sys.argv:
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            print("\n💫 Dissolving back into the trust field...")
+    else:
+        quickstart()
\ No newline at end of file
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+DMCT Persistent Consensus - Memory that survives the night
+Every event is appended to a log on disk and the derived state is
+snapshotted now and then, so a restarted node maps its history back in
+and only replays what happened after the last snapshot.
+"""
+
+import mmap
+import os
+import pickle
+import struct
+import time
+from array import array
+import consensus
+
+SNAPSHOT_EVERY = 1000  # Events between snapshots; bounds the replay after a crash
+
+# id, x, y, z, time, amplitude, payload index: seven 8-byte words per event
+EVENT_RECORD = struct.Struct('=Q5dQ')
+PAYLOAD_HEADER = struct.Struct('=I')
+
+class PersistentConsensus(consensus.SpacetimeConsensus):
+    """
+    SpacetimeConsensus backed by a directory:
+      events.log    fixed-width event records, append-only unless a finality
+                    is set and final events get pruned
+      payloads.log  each distinct payload once, append-only
+      snapshot.pkl  confirmations, standing waves and the id table as of
+                    the first N events, replaced atomically
+    Reopening maps events.log, takes the snapshot for its first N events
+    and replays only the rest. Light cones are worked out from the log
+    itself, so they need no snapshot of their own. Pruning final events
+    writes the shortened log beside events.log, then a snapshot of the
+    state it leaves, and only then swaps the log in; each compaction is
+    numbered, so a reopen finishes a swap its snapshot already describes
+    and discards one it does not.
+    """
+
+    def __init__(self, directory, snapshot_every=SNAPSHOT_EVERY, finality=None):
+        super().__init__(finality)
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.since_snapshot = 0
+        self.generation = 0  # Compactions so far
+        os.makedirs(directory, exist_ok=True)
+
+        self.events_path = os.path.join(directory, 'events.log')
+        self.payloads_path = os.path.join(directory, 'payloads.log')
+        self.snapshot_path = os.path.join(directory, 'snapshot.pkl')
+        self.restored = self._restore()
+
+        self.events_file = open(self.events_path, 'ab')
+        self.payloads_file = open(self.payloads_path, 'ab')
+
+    def _append(self, event):
+        log = self.log
+        payloads = len(log.payloads)
+        row = super()._append(event)
+
+        # New payloads go to disk before the events that point at them
+        for index in range(payloads, len(log.payloads)):
+            blob = pickle.dumps((log.payloads[index], log.payload_keys[index]))
+            self.payloads_file.write(PAYLOAD_HEADER.pack(len(blob)) + blob)
+        if len(log.payloads) > payloads:
+            self.payloads_file.flush()
+
+        self.events_file.write(self._record(row))
+        self.since_snapshot += 1
+        return row
+
+    def _record(self, row):
+        log = self.log
+        return EVENT_RECORD.pack(
+            log.ids[row], log.x[row], log.y[row], log.z[row],
+            log.t[row], log.amplitude[row], log.payload[row]
+        )
+
+    def _check_interference(self, row, sketches=None):
+        super()._check_interference(row, sketches)
+        if row == len(self.log) - 1:
+            self._settle()  # Not partway through a batch, whose later rows are not applied yet
+
+    def merge_replicas(self, replicas, workers=None):
+        merged = super().merge_replicas(replicas, workers)
+        self._settle()
+        return merged
+
+    def prune(self, now=None):
+        pruned = super().prune(now)
+        if pruned:
+            self._compact()
+        return pruned
+
+    def _compact(self):
+        """Rewrite events.log to hold just the rows still in the log"""
+        generation = self.generation + 1
+        compacted = self._compacted_path(generation)
+        with open(compacted, 'wb') as f:
+            for row in range(len(self.log)):
+                f.write(self._record(row))
+            f.flush()
+            os.fsync(f.fileno())
+
+        # The pruned events leave the disk only once a snapshot holding
+        # their checkpoints is there to replace them
+        self.generation = generation
+        self.snapshot()
+        self.events_file.close()
+        os.replace(compacted, self.events_path)
+        self.events_file = open(self.events_path, 'ab')
+
+    def _compacted_path(self, generation):
+        return f"{self.events_path}.{generation}.compact"
+
+    def _finish_compaction(self):
+        """Swap in a compacted log the snapshot was written for; drop any other"""
+        prefix = os.path.basename(self.events_path) + '.'
+        for name in os.listdir(self.directory):
+            if not (name.startswith(prefix) and name.endswith('.compact')):
+                continue
+            path = os.path.join(self.directory, name)
+            if path == self._compacted_path(self.generation):
+                os.replace(path, self.events_path)
+            else:
+                os.remove(path)  # Its snapshot never landed; events.log is still whole
+
+    def _settle(self):
+        # One flush, and at most one snapshot, per submit however many events it carried
+        self.events_file.flush()
+        if self.since_snapshot >= self.snapshot_every:
+            self.snapshot()
+
+    def snapshot(self):
+        """Write the derived state for every event logged so far"""
+        self.events_file.flush()
+        self.payloads_file.flush()
+        log = self.log
+        state = {
+            'events': len(log),
+            'last': log.ids[-1] if len(log) else None,
+            'payloads': len(log.payloads),
+            'confirmations': log.confirmations.tobytes(),
+            'table': log.table.tobytes(),
+            'standing_waves': self.standing_waves,
+            'checkpoints': self.checkpoints,
+            'generation': self.generation,
+            'seen': list(self.seen)
+        }
+
+        partial = self.snapshot_path + '.tmp'
+        with open(partial, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(partial, self.snapshot_path)
+        self.since_snapshot = 0
+
+    def _restore(self):
+        """Load the history on disk; returns how many events had to be replayed"""
+        log = self.log
+        state = None
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'rb') as f:
+                state = pickle.load(f)
+            self.generation = state.get('generation', 0)
+        self._finish_compaction()
+
+        for data, key in self._read_payloads():
+            log.store(data, key)  # Every entry, in order: rows on disk point at these indexes
+
+        size = os.path.getsize(self.events_path) if os.path.exists(self.events_path) else 0
+        count = size // EVENT_RECORD.size
+        if size != count * EVENT_RECORD.size:
+            # A torn last record from a crash mid-write
+            with open(self.events_path, 'r+b') as f:
+                f.truncate(count * EVENT_RECORD.size)
+        if not count:
+            return 0
+
+        if state:
+            if state['events'] > count or state['payloads'] > len(log.payloads):
+                state = None  # Snapshot is ahead of the logs it describes
+            elif state['events'] and state.get('last') is not None:
+                with open(self.events_path, 'rb') as f:
+                    f.seek((state['events'] - 1) * EVENT_RECORD.size)
+                    last, = struct.unpack_from('=Q', f.read(8))
+                if last != state['last']:
+                    state = None  # Taken before the log was compacted under it
+        covered = state['events'] if state else 0
+
+        with open(self.events_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                words = view[:covered * EVENT_RECORD.size]
+                ints, floats = words.cast('Q'), words.cast('d')
+                log.ids = array('Q', ints[0::7])
+                log.x = array('d', floats[1::7])
+                log.y = array('d', floats[2::7])
+                log.z = array('d', floats[3::7])
+                log.t = array('d', floats[4::7])
+                log.amplitude = array('d', floats[5::7])
+                log.payload = array('I', ints[6::7])
+                del words, ints, floats
+
+                tail = [EVENT_RECORD.unpack_from(view, row * EVENT_RECORD.size)
+                        for row in range(covered, count)]
+            finally:
+                view.release()
+
+        if state:
+            log.confirmations = array('d')
+            log.confirmations.frombytes(state['confirmations'])
+            log.table = array('i')
+            log.table.frombytes(state['table'])
+            self.standing_waves = state['standing_waves']
+            self.checkpoints = state.get('checkpoints', {})
+            for event_id in state['seen']:
+                self._remember(event_id)
+
+        # Events after the snapshot are already on disk; apply them again
+        for key, x, y, z, t, amplitude, payload in tail:
+            row = super()._append({
+                'id': format(key, '016x'),
+                'position': (x, y, z),
+                'time': t,
+                'data': log.payloads[payload],
+                'amplitude': amplitude,
+                'confirmations': 0
+            })
+            self._remember(log.id(row))
+            self._update_light_cones(row)
+            super()._check_interference(row)
+        self.since_snapshot = len(tail)
+        return len(tail)
+
+    def _read_payloads(self):
+        if not os.path.exists(self.payloads_path):
+            return []
+        with open(self.payloads_path, 'rb') as f:
+            blob = f.read()
+
+        payloads = []
+        offset = 0
+        while offset + PAYLOAD_HEADER.size <= len(blob):
+            length, = PAYLOAD_HEADER.unpack_from(blob, offset)
+            end = offset + PAYLOAD_HEADER.size + length
+            if end > len(blob):
+                break
+            payloads.append(pickle.loads(blob[offset + PAYLOAD_HEADER.size:end]))
+            offset = end
+
+        if offset != len(blob):
+            with open(self.payloads_path, 'r+b') as f:
+                f.truncate(offset)
+        return payloads
+
+    def close(self):
+        """Snapshot and close the logs"""
+        if self.events_file.closed:
+            return
+        self.snapshot()
+        self.events_file.close()
+        self.payloads_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+
+    directory = tempfile.mkdtemp(prefix='dmct-')
+    tx_data = {'from': 'Alice', 'to': 'Bob', 'amount': 10, 'token': 'DMC'}
+
+    print("💾 Writing consensus history to disk...")
+    with PersistentConsensus(directory) as ledger:
+        for i in range(20):
+            ledger.submit_event((i % 5, i // 5, 0), tx_data)
+        before = ledger.get_consensus(str(tx_data))
+
+    print("🔌 Restarting node...")
+    start = time.perf_counter()
+    with PersistentConsensus(directory) as ledger:
+        after = ledger.get_consensus(str(tx_data))
+        elapsed = time.perf_counter() - start
+        print(f"  {len(ledger.events)} events back in {elapsed * 1000:.1f} ms, "
+              f"{ledger.restored} replayed")
+
+    print(f"\n✅ Consensus survived the restart: {before == after}")
+    shutil.rmtree(directory)
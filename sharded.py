@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+DMCT Sharded Network - One universe, many interpreters
+Space is cut into cells, each cell belongs to a worker process, and waves
+that cross a cell border travel between workers as halo messages.
+"""
+
+import math
+import multiprocessing
+import dmct
+
+SHARD_CELL = dmct.NEIGHBOR_RADIUS * 4
+
+class _Ghost:
+    """A neighbor that lives in another shard: deliveries to it become halo messages"""
+
+    def __init__(self, key, owner, position, outbox, clock):
+        self.key = key
+        self.owner = owner
+        self.position = position
+        self.neighbors = []
+        self.neighbor_set = set()
+        self.network = None
+        self.outbox = outbox
+        self.clock = clock
+
+    def _receive_wave(self, wave):
+        # Fires when the wave reaches the border, on the sending shard's clock
+        self.outbox.append((self.owner, self.key, wave, self.clock.now()))
+
+def _shard_worker(conn, shard, seed, start, epoch):
+    """Worker process: a local Network on its own simulated clock"""
+    with dmct.Simulation(seed=seed, start=start) as engine:
+        network = dmct.Network(engine)
+        network.epoch = epoch
+        nodes = {}
+        ghosts = {}
+        outbox = []
+
+        def ghost(key, owner, position):
+            if key not in ghosts:
+                x, y, z = position
+                ghosts[key] = _Ghost(key, owner, dmct.SpacetimePoint(x, y, z), outbox, engine.clock)
+            return ghosts[key]
+
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            now, inbound, ops = message
+
+            engine.run(until=now)
+            for key, wave, arrival in inbound:
+                engine.schedule(max(0.0, arrival - now), 'halo', nodes[key]._receive_wave, wave)
+
+            results = []
+            for op in ops:
+                kind = op[0]
+                if kind == 'add':
+                    _, key, (x, y, z, t), identity, aggregate, remotes = op
+                    node = dmct.Node(dmct.SpacetimePoint(x, y, z, t), identity=identity,
+                                     executor=engine, aggregate=aggregate)
+                    node.key = key
+                    nodes[key] = node
+                    for rkey, owner, position in remotes:
+                        node.connect(ghost(rkey, owner, position))
+                    network.add_node(node)
+                    results.append(key)
+                elif kind == 'link':
+                    _, rkey, owner, position, local_keys = op
+                    remote = ghost(rkey, owner, position)
+                    for key in local_keys:
+                        nodes[key].connect(remote)
+                    results.append(rkey)
+                elif kind == 'emit':
+                    _, key, amplitude, data = op
+                    results.append(nodes[key].emit(amplitude=amplitude, data=data))
+                elif kind == 'pulse':
+                    _, amplitude, data = op
+                    for node in list(nodes.values()):
+                        node.emit(amplitude=amplitude, data=data)
+                    results.append(len(nodes))
+                elif kind == 'state':
+                    results.append(network.visualize())
+                elif kind == 'totals':
+                    results.append(network.totals())
+                elif kind == 'stats':
+                    results.append({**engine.stats(), 'nodes': len(nodes), 'ghosts': len(ghosts)})
+
+            conn.send((results, outbox[:]))
+            del outbox[:]
+
+class ShardNode:
+    """Stand-in for a node that lives inside a shard worker"""
+
+    def __init__(self, network, key, shard, position, identity):
+        self.network = network
+        self.key = key
+        self.shard = shard
+        self.position = position
+        self.identity = identity
+        self.executor = None
+
+    def emit(self, amplitude=1.0, data=None):
+        return self.network._call(self.shard, ('emit', self.key, amplitude, data))
+
+class ShardedNetwork:
+    """
+    Drop-in Network whose nodes are spread over worker processes.
+    Space is cut into SHARD_CELL cubes dealt round-robin to workers. Each
+    worker runs its own Network on a simulated clock that is kept in step
+    with dmct.clock on every call. A wave sent to a neighbor in another
+    shard is handed over as a halo message and is delivered at most one
+    exchange after it reaches the border.
+    """
+
+    def __init__(self, workers=4, seed=None, cell_size=SHARD_CELL):
+        self.workers = workers
+        self.cell_size = cell_size
+        self.nodes = []
+        self.epoch = dmct.clock.now()
+        self.executor = None
+        self.index = dmct.SpatialGrid(dmct.NEIGHBOR_RADIUS * 2)
+        self.halos = [[] for _ in range(workers)]
+        self.halo_count = 0
+
+        self.conns = []
+        self.procs = []
+        for shard in range(workers):
+            parent, child = multiprocessing.Pipe()
+            proc = multiprocessing.Process(
+                target=_shard_worker,
+                args=(child, shard, None if seed is None else seed + shard, self.epoch, self.epoch),
+                daemon=True
+            )
+            proc.start()
+            self.conns.append(parent)
+            self.procs.append(proc)
+
+    def owner(self, position):
+        size = self.cell_size
+        i = math.floor(position.x / size)
+        j = math.floor(position.y / size)
+        k = math.floor(position.z / size)
+        return (i + j * 7 + k * 13) % self.workers
+
+    def _exchange(self, batches):
+        """Send each shard its ops plus pending halos; return results per shard"""
+        now = dmct.clock.now()
+        busy = []
+        for shard, ops in batches.items():
+            self.conns[shard].send((now, self.halos[shard], ops))
+            self.halos[shard] = []
+            busy.append(shard)
+
+        results = {}
+        for shard in busy:
+            results[shard], outbox = self.conns[shard].recv()
+            for owner, key, wave, arrival in outbox:
+                self.halos[owner].append((key, wave, arrival))
+            self.halo_count += len(outbox)
+        return results
+
+    def _call(self, shard, op):
+        return self._exchange({shard: [op]})[shard][0]
+
+    def add_node(self, node):
+        self.add_nodes([node])
+
+    def add_nodes(self, nodes):
+        """Join many nodes in one exchange, each shard building its part in parallel"""
+        batches = {}
+        for node in nodes:
+            position = node.position
+            shard = self.owner(position)
+            key = len(self.nodes)
+            proxy = ShardNode(self, key, shard, position, node.identity)
+
+            # Neighbors across the border, and the shards that must link back
+            remotes = []
+            links = {}
+            for other in self.index.within(position, dmct.NEIGHBOR_RADIUS * 2):
+                if other.shard != shard and position.distance(other.position) < dmct.NEIGHBOR_RADIUS * 2:
+                    p = other.position
+                    remotes.append((other.key, other.shard, (p.x, p.y, p.z)))
+                    links.setdefault(other.shard, []).append(other.key)
+
+            batches.setdefault(shard, []).append(
+                ('add', key, (position.x, position.y, position.z, position.t),
+                 node.identity, getattr(node, 'aggregate', False), remotes))
+            for other_shard, local_keys in links.items():
+                batches.setdefault(other_shard, []).append(
+                    ('link', key, shard, (position.x, position.y, position.z), local_keys))
+
+            self.nodes.append(proxy)
+            self.index.insert(proxy, position)
+
+        self._exchange(batches)
+
+    def pulse(self, amplitude=1.0, data=None):
+        """Every node emits once, all shards at the same time"""
+        parts = self._exchange({shard: [('pulse', amplitude, data)] for shard in range(self.workers)})
+        return sum(parts[shard][0] for shard in range(self.workers))
+
+    def advance(self):
+        """Bring every shard up to dmct.clock and pass on pending halos"""
+        self._exchange({shard: [] for shard in range(self.workers)})
+
+    def visualize(self):
+        now = dmct.clock.now()
+        parts = self._exchange({shard: [('state',)] for shard in range(self.workers)})
+        state = {
+            'nodes': [],
+            'waves': [],
+            'time': now - self.epoch
+        }
+        for shard in range(self.workers):
+            state['nodes'].extend(parts[shard][0]['nodes'])
+            state['waves'].extend(parts[shard][0]['waves'])
+        return state
+
+    def totals(self):
+        now = dmct.clock.now()
+        parts = self._exchange({shard: [('totals',)] for shard in range(self.workers)})
+        shards = [parts[shard][0] for shard in range(self.workers)]
+        return {
+            'nodes': len(self.nodes),
+            'waves_seen': sum(part['waves_seen'] for part in shards),
+            'field': sum(part['field'] for part in shards),
+            'time': now - self.epoch,
+            'version': sum(part['version'] for part in shards)
+        }
+
+    def stats(self):
+        parts = self._exchange({shard: [('stats',)] for shard in range(self.workers)})
+        return {
+            'workers': self.workers,
+            'halo_messages': self.halo_count,
+            'shards': [parts[shard][0] for shard in range(self.workers)]
+        }
+
+    def close(self):
+        for conn in self.conns:
+            conn.send(None)
+        for proc in self.procs:
+            proc.join()
+        self.conns, self.procs = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+if __name__ == "__main__":
+    print("🌌 Sharding the trust universe across 4 workers...")
+
+    with dmct.Simulation(seed=7) as engine, ShardedNetwork(workers=4, seed=7) as network:
+        dmct.genesis(network)
+        dmct.simulate(network, duration=30, engine=engine)
+        stats = network.stats()
+
+    print(f"\n\n💫 {stats['halo_messages']} waves crossed shard borders")
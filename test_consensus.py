@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""Test DMCT consensus and its persistence"""
+
+import math
+import os
+import random
+import shutil
+import tempfile
+import consensus
+import persistent
+
+# Colors
+PURPLE = '\033[0;35m'
+CYAN = '\033[0;36m'
+GREEN = '\033[0;32m'
+YELLOW = '\033[0;33m'
+NC = '\033[0m'
+
+def _events(n, start, seed=0, keys=3, step=2.0):
+    """Rebroadcast-style events at fixed times, a few data keys between them"""
+    rng = random.Random(seed)
+    return [{
+        'id': format(rng.getrandbits(64), '016x'),
+        'position': (rng.uniform(0, 5), rng.uniform(0, 5), 0.0),
+        'time': start + i * step,
+        'data': {'tx': i % keys},
+        'amplitude': 1.0,
+        'confirmations': 0
+    } for i in range(n)]
+
+def _states(ledger):
+    return {key: ledger.get_consensus(key) for key in ledger.standing_waves}
+
+def _confirmations(ledger):
+    log = ledger.log
+    return {log.id(row): log.confirmations[row] for row in range(len(log))}
+
+class _Clock:
+    """Stands in for consensus's time module: each reading a fixed step after the last"""
+    def __init__(self, start, step):
+        self.now = start
+        self.step = step
+
+    def time(self):
+        self.now += self.step
+        return self.now
+
+def _submitted(submit, items):
+    clock, consensus.time = consensus.time, _Clock(1.7e9, 0.5)
+    try:
+        ledger = consensus.SpacetimeConsensus()
+        submit(ledger, items)
+        return ledger
+    finally:
+        consensus.time = clock
+
+def test_batch_matches_sequential():
+    """submit_events leaves the same ids, confirmations and consensus as one submit_event per item"""
+    rng = random.Random(4)
+    items = [((rng.uniform(0, 5), rng.uniform(0, 5), 0.0), {'tx': i % 4}, rng.uniform(0.5, 2))
+             for i in range(300)]
+
+    def one_by_one(ledger, items):
+        for position, data, amplitude in items[:100]:
+            ledger.submit_event(position, data, amplitude)
+        for position, data, amplitude in items[100:]:
+            ledger.submit_event(position, data, amplitude)
+
+    def batched(ledger, items):
+        ledger.submit_events(items[:100])
+        ledger.submit_events(iter(items[100:]))
+
+    sequential, batch = _submitted(one_by_one, items), _submitted(batched, items)
+    assert _confirmations(batch) == _confirmations(sequential)
+    assert _states(batch) == _states(sequential)
+
+def test_confirmations_match_dicts():
+    """Columnar interference confirms exactly what the list-of-dicts version did"""
+    events = _events(300, 1.7e9, step=0.3)
+    rng = random.Random(6)
+    for event in events:
+        event['amplitude'] = rng.uniform(0.5, 2)
+
+    ledger = consensus.SpacetimeConsensus()
+    dicts = []
+    for event in events:
+        ledger.receive_event(event)
+        # The interference loop SpacetimeConsensus had before the event log
+        new = dict(event, confirmations=0)
+        dicts.append(new)
+        for other in dicts:
+            if other['id'] == new['id']:
+                continue
+            if abs(math.cos(ledger._calculate_phase_difference(other, new))) > 0.8:
+                other['confirmations'] += new['amplitude']
+                new['confirmations'] += other['amplitude']
+
+    assert _confirmations(ledger) == {event['id']: event['confirmations'] for event in dicts}
+
+def test_merge_matches_sequential():
+    """Merging replicas, in-process or over a pool, ends where receiving their events in turn does"""
+    shared, ours = _events(200, 1.7e9, keys=4), _events(30, 1.7e9 + 400, seed=1, keys=4)
+    theirs = [_events(40, 1.7e9 + 100 * n, seed=2 + n, keys=4) for n in range(3)]
+
+    def replica(events):
+        ledger = consensus.SpacetimeConsensus()
+        for event in events:
+            ledger.receive_event(event)
+        return ledger
+
+    want = replica(shared + ours + [event for events in theirs for event in events])
+    for workers in (1, 2):
+        ledger = replica(shared + ours)
+        replicas = [replica(shared[:50] + events) for events in theirs]
+        assert ledger.merge_replicas(replicas, workers=workers) == len(want.events)
+        assert ledger.last_merge['merged'] == 120
+        assert _confirmations(ledger) == _confirmations(want), workers
+        assert _states(ledger) == _states(want), workers
+
+def test_reopen_after_crash():
+    """A reopened log serves the same consensus after a clean close, a torn write or a stale snapshot"""
+    events = _events(300, 1.7e9, keys=4)
+
+    def ledger_of(events):
+        ledger = consensus.SpacetimeConsensus()
+        for event in events:
+            ledger.receive_event(event)
+        return ledger
+
+    def crash(ledger):
+        # Whatever was written stays on disk; nothing is snapshotted on the way out
+        ledger.events_file.close()
+        ledger.payloads_file.close()
+
+    directory = tempfile.mkdtemp(prefix='dmct-test-')
+    try:
+        with persistent.PersistentConsensus(directory, snapshot_every=10 ** 6) as ledger:
+            for event in events[:200]:
+                ledger.receive_event(event)
+        with persistent.PersistentConsensus(directory) as reopened:
+            assert reopened.restored == 0
+            want = ledger_of(events[:200])
+            assert _states(reopened) == _states(want)
+            assert _confirmations(reopened) == _confirmations(want)
+
+        # Events after the snapshot, then half a record of each log
+        ledger = persistent.PersistentConsensus(directory, snapshot_every=10 ** 6)
+        for event in events[200:]:
+            ledger.receive_event(event)
+        crash(ledger)
+        for name in ('events.log', 'payloads.log'):
+            with open(os.path.join(directory, name), 'ab') as f:
+                f.write(b'\x07' * 11)
+        with persistent.PersistentConsensus(directory) as reopened:
+            assert reopened.restored == 100
+            want = ledger_of(events)
+            assert _states(reopened) == _states(want)
+            assert _confirmations(reopened) == _confirmations(want)
+            assert not reopened.receive_event(events[-1])
+        assert os.path.getsize(os.path.join(directory, 'events.log')) == 300 * persistent.EVENT_RECORD.size
+
+        # A snapshot that covers events the log lost
+        with open(os.path.join(directory, 'events.log'), 'r+b') as f:
+            f.truncate(250 * persistent.EVENT_RECORD.size)
+        with persistent.PersistentConsensus(directory) as reopened:
+            assert reopened.restored == 250
+            want = ledger_of(events[:250])
+            assert _states(reopened) == _states(want)
+            assert _confirmations(reopened) == _confirmations(want)
+    finally:
+        shutil.rmtree(directory)
+
+class _Crash(Exception):
+    pass
+
+def test_compaction_crash():
+    """A crash partway through compacting the log loses nothing"""
+    old = _events(900, 1.7e9)
+    fresh = _events(90, 1.7e9 + 6000, seed=1)
+
+    for crash_at in ('snapshot', 'swap'):
+        directory = tempfile.mkdtemp(prefix='dmct-test-')
+        try:
+            ledger = persistent.PersistentConsensus(directory, finality=3600.0)
+            for event in old + fresh:
+                ledger.receive_event(event)
+            want = _states(ledger)
+
+            replace = os.replace
+
+            def fail(*args):
+                if crash_at == 'snapshot' or args[0].endswith('.compact'):
+                    raise _Crash
+                replace(*args)
+            if crash_at == 'snapshot':
+                ledger.snapshot = fail
+            else:
+                os.replace = fail
+            try:
+                ledger.prune()
+                assert False, "no crash"
+            except _Crash:
+                pass
+            finally:
+                os.replace = replace
+            ledger.events_file.close()
+            ledger.payloads_file.close()
+
+            with persistent.PersistentConsensus(directory, finality=3600.0) as reopened:
+                assert _states(reopened) == want, crash_at
+                assert not reopened.receive_event(old[3])
+            assert not [name for name in os.listdir(directory) if name.endswith('.compact')]
+        finally:
+            shutil.rmtree(directory)
+
+def test_finality_opt_in():
+    """Nothing is pruned by default; with a finality, a merge reports the late events it refused"""
+    old = _events(1100, 1.7e9)
+    kept = consensus.SpacetimeConsensus()
+    for event in old:
+        kept.receive_event(event)
+    assert len(kept.events) == 1100 and kept.prune() == 0
+
+    # Every tenth early event stays with a replica cut off for longer than the horizon
+    cut_off = old[:450:10]
+    ledger = consensus.SpacetimeConsensus(finality=3600.0)
+    for event in [event for event in old[:900] if event not in cut_off] + _events(90, 1.7e9 + 6000, seed=1):
+        ledger.receive_event(event)
+    assert ledger.prune() == 900 - len(cut_off)
+
+    late = consensus.SpacetimeConsensus()
+    for event in cut_off:
+        late.receive_event(event)
+    ledger.merge_replicas([late])
+    assert ledger.last_merge == {'merged': 0, 'dropped_final': len(cut_off)}, ledger.last_merge
+    assert ledger.dropped_final == len(cut_off)
+
+def test_payload_interning():
+    """Equal payloads share a table entry; unequal ones with the same encoding do not"""
+    log = consensus.EventLog()
+    assert log.intern({'a': 1}, 'a') == log.intern({'a': 1}, 'a') == 0
+    assert [log.intern(value, 'k') for value in ((1, 2), [1, 2], [1, 2], (1, 2))] == [1, 2, 2, 1]
+    nan = float('nan')
+    assert len({log.intern(nan, 'n') for _ in range(6)}) == 6  # Never equal, never merged
+    assert log.payloads[1] == (1, 2) and log.payloads[2] == [1, 2]
+
+def test_light_cones_match_scan():
+    """Futures and membership from the index agree with a scan of every event, late times included"""
+    events = _events(400, 1.7e9, step=0.05)
+    rng = random.Random(2)
+    for event in events[::7]:
+        event['time'] -= rng.uniform(0, 10)  # Filed after events that came later
+    ledger = consensus.SpacetimeConsensus()
+    for event in events:
+        ledger._append(dict(event))
+    log = ledger.log
+
+    for row in range(0, len(log), 13):
+        want = [r for r in range(row + 1, len(log)) if ledger.causal.connected(row, r)]
+        assert ledger.causal.future(row) == want, row
+        assert (log.id(row) in ledger.light_cones) == bool(want), row
+
+def test_render_any_center():
+    """A list centre renders, and shares cached tiles with the same tuple centre"""
+    ledger = consensus.SpacetimeConsensus()
+    for event in _events(50, 1.7e9):
+        ledger.receive_event(event)
+    field = ledger.visualize_consensus_field(16, center=[1.0, 2.0])
+    misses = ledger.renderer.misses
+    assert ledger.visualize_consensus_field(16, center=(1.0, 2.0)) == field
+    assert ledger.renderer.misses == misses
+
+class _Token:
+    def __init__(self, name):
+        self.name = name
+
+def test_event_ids_canonical():
+    """Payloads with mixed or tuple keys, sets and objects hash the same in every process"""
+    import subprocess
+    import sys
+
+    ledger = consensus.SpacetimeConsensus()
+    assert ledger.submit_event((0, 0, 0), {1: 'a', 'b': 2})
+    assert ledger.submit_event((0, 0, 0), {(1, 2): 'a'})
+
+    payload = {1: 'a', 'b': {'x', 'y', 'z'}, (1, 2): frozenset({3, 'w'}), 'token': _Token('t')}
+    assert ledger._hash_event((0, 0, 0), 5.0, payload) != ledger._hash_event((0, 0, 0), 5.0, {**payload, 1: 'b'})
+    script = ("import consensus, test_consensus as t; "
+              "print(consensus.SpacetimeConsensus()._hash_event((0, 0, 0), 5.0, "
+              "{1: 'a', 'b': {'x', 'y', 'z'}, (1, 2): frozenset({3, 'w'}), 'token': t._Token('t')}))")
+    here = os.path.dirname(os.path.abspath(__file__))
+    ids = {subprocess.run([sys.executable, '-c', script], cwd=here, capture_output=True, text=True,
+                          env={**os.environ, 'PYTHONHASHSEED': str(seed)}).stdout.strip()
+           for seed in (1, 2, 3)}
+    assert len(ids) == 1 and '' not in ids, ids
+
+if __name__ == "__main__":
+    print(f"{PURPLE}Testing DMCT consensus{NC}\n")
+
+    failed = 0
+    for name, test in list(globals().items()):
+        if not name.startswith('test_'):
+            continue
+        print(f"{CYAN}{test.__doc__}...{NC}")
+        try:
+            test()
+            print(f"{GREEN}✓ {name}{NC}")
+        except AssertionError as e:
+            failed += 1
+            print(f"{YELLOW}✗ {name}: {e}{NC}")
+
+    print(f"\n{GREEN if not failed else YELLOW}{failed} failed{NC}")
+    exit(1 if failed else 0)
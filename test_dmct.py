@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""Test the DMCT trust core"""
+
+import contextlib
+import io
+import dmct
+
+# Colors
+PURPLE = '\033[0;35m'
+CYAN = '\033[0;36m'
+GREEN = '\033[0;32m'
+YELLOW = '\033[0;33m'
+NC = '\033[0m'
+
+def _pair(engine):
+    """Two connected nodes one unit apart, delivering through engine"""
+    network = dmct.Network(engine)
+    a = dmct.Node(dmct.SpacetimePoint(0, 0, 0))
+    b = dmct.Node(dmct.SpacetimePoint(1, 0, 0))
+    with contextlib.redirect_stdout(io.StringIO()):
+        network.add_node(a)
+        network.add_node(b)
+    return network, a, b
+
+def test_same_instant_emissions():
+    """Two waves a node emits in one instant are both delivered"""
+    with dmct.Simulation(seed=1) as engine:
+        _, a, b = _pair(engine)
+        engine.run(5)
+        one = a.emit(data={'msg': 'one'})
+        two = a.emit(data={'msg': 'two'})
+        engine.run(10)
+
+    assert one.id != two.id
+    received = [wave.data.get('msg') for wave in b.waves]
+    assert 'one' in received and 'two' in received, received
+    assert b.counters['duplicates_dropped'] == 0
+
+def test_genesis_ids():
+    """Join and genesis waves from one node in one instant get their own ids"""
+    with dmct.Simulation(seed=1):
+        network = dmct.genesis()
+    ids = [wave.id for wave in network.nodes[0].waves]
+    assert len(ids) == len(set(ids)), ids
+
+def test_network_usable_after_simulate():
+    """Emits after simulate() returns still reach neighbors"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        network = dmct.genesis()
+        dmct.simulate(network, duration=1, seed=3)
+    node = network.nodes[1]
+    assert node.executor is dmct.default_executor()
+
+    wave = node.emit(data={'msg': 'after'})
+    node.executor.join()
+    assert all(wave.id in neighbor.seen for neighbor in node.neighbors)
+
+def test_simulate_restores_rng_and_delivers_everything():
+    """simulate() hands back the caller's random stream and delivers every wave it sent"""
+    class Counted(dmct.Simulation):
+        sent = 0
+
+        def submit(self, fn, *args, delay=0.0):
+            self.sent += 1
+            super().submit(fn, *args, delay=delay)
+
+    dmct.rng.seed(42)
+    expected = dmct.rng.getstate()
+    engine = Counted(seed=3)
+    with contextlib.redirect_stdout(io.StringIO()):
+        with engine:
+            network = dmct.genesis()
+        dmct.simulate(network, duration=20, engine=engine)
+    assert dmct.rng.getstate() == expected
+
+    assert engine.sent and engine.processed['receive'] == engine.sent, (engine.sent, engine.processed)
+    assert not engine.events
+
+def test_bad_wave_leaves_store_intact():
+    """A wave with a bad field is refused whole, by the store and by the packet parser"""
+    import network_node
+
+    store = dmct.WaveStore(epsilon=0)
+    for n in range(2):
+        store.append(dmct.TrustWave(dmct.SpacetimePoint(n, 0, 0, 0.0), phase=0.3 * n))
+    point = dmct.SpacetimePoint(3, 1, 0, 10.0)
+    before = store.field_at(point)
+
+    bad = dmct.TrustWave(dmct.SpacetimePoint(0, "bad", 0, 0.0))
+    try:
+        store.append(bad)
+        assert False, "bad wave was taken"
+    except ValueError:
+        pass
+    assert len(store) == 2
+    assert store.field_at(point) == before
+
+    packet = network_node._wave_packet(bad)
+    try:
+        network_node._parse_wave(packet)
+        assert False, "bad packet was parsed"
+    except TypeError:
+        pass
+
+def test_failed_delivery_reported():
+    """A delivery that raises is counted and reported, not swallowed"""
+    import threading
+
+    reported = []
+    hook, threading.excepthook = threading.excepthook, reported.append
+    try:
+        executor = dmct.PropagationExecutor(inline=True)
+        executor.submit(lambda: 1 / 0)
+        executor.submit(lambda: None)
+    finally:
+        threading.excepthook = hook
+
+    stats = executor.stats()
+    assert stats['failed'] == 1 and stats['completed'] == 2, stats
+    assert [args.exc_type for args in reported] == [ZeroDivisionError]
+
+def test_failed_wave_reported():
+    """A wave an async node's worker fails on is counted and reported too"""
+    import threading
+    import network_node
+
+    class Failing(network_node.AsyncNetworkNode):
+        def _receive_wave(self, wave):
+            if wave.data.get('bad'):
+                raise ValueError(wave.id)
+            super()._receive_wave(wave)
+
+    node = Failing(port=0)
+    node.inbox.extend(dmct.TrustWave(dmct.SpacetimePoint(0, 0, 0), data={'bad': bad}) for bad in (True, False))
+    reported = []
+    hook, threading.excepthook = threading.excepthook, reported.append
+    try:
+        processed, failed = node._drain()
+    finally:
+        threading.excepthook = hook
+        node.pool.shutdown()
+    assert (processed, failed) == (1, 1)
+    assert [args.exc_type for args in reported] == [ValueError]
+
+def test_phasor_matches_exact_field():
+    """phasor_field_at agrees with field_at for mixed origins, late waves and queries back in time"""
+    import math
+    import random
+
+    rng = random.Random(5)
+    emitters = [(rng.uniform(-10, 10), rng.uniform(-10, 10), rng.uniform(-10, 10), frequency)
+                for frequency in (0.3, 0.7) for _ in range(3)]
+    receivers = [(0, 0, 0), (4, -2, 1)]
+    store = dmct.WaveStore(epsilon=0)
+
+    def add(t):
+        x, y, z, frequency = rng.choice(emitters)
+        store.append(dmct.TrustWave(dmct.SpacetimePoint(x, y, z, t), amplitude=rng.uniform(-2, 2),
+                                    frequency=frequency, phase=rng.random() * 2 * math.pi))
+
+    def check(t):
+        scale = sum(abs(wave.amplitude) for wave in store)
+        for x, y, z in receivers:
+            point = dmct.SpacetimePoint(x, y, z, t)
+            error = abs(store.field_at(point) - store.phasor_field_at(point))
+            assert error <= 1e-9 * scale, (t, (x, y, z), error)
+
+    # Emission times out of order, some still on their way at the first query
+    for _ in range(200):
+        add(rng.uniform(0, 100))
+    for step in range(40):
+        t = 60 + step * 2.5
+        # Late arrivals: emitted before waves already folded into the sums
+        add(t - rng.uniform(0, 80))
+        check(t)
+        if step % 10 == 9:
+            check(t - rng.uniform(5, 50))  # Back in time
+
+if __name__ == "__main__":
+    print(f"{PURPLE}Testing DMCT trust core{NC}\n")
+
+    failed = 0
+    for name, test in list(globals().items()):
+        if not name.startswith('test_'):
+            continue
+        print(f"{CYAN}{test.__doc__}...{NC}")
+        try:
+            test()
+            print(f"{GREEN}✓ {name}{NC}")
+        except AssertionError as e:
+            failed += 1
+            print(f"{YELLOW}✗ {name}: {e}{NC}")
+
+    print(f"\n{GREEN if not failed else YELLOW}{failed} failed{NC}")
+    exit(1 if failed else 0)